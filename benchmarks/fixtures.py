@@ -0,0 +1,102 @@
+"""Size-scalable JSON fixtures shaped like each scraper's API responses."""
+import random
+from typing import Dict, List
+
+STYLE_CODES = 5000
+
+
+def style_code(i: int) -> str:
+    """Deterministic Nike-like style code shared by fixtures of all sources."""
+    return f"DD{1000 + i % STYLE_CODES:04d}-{i % 997:03d}"
+
+
+def adidas_page(start: int, size: int) -> Dict:
+    """Page of the Adidas content-engine API."""
+    return {
+        "raw": {
+            "itemList": {
+                "items": [
+                    {
+                        "modelId": style_code(i).replace("-", ""),
+                        "salePrice": 299.99 + i % 400,
+                        "link": f"/buty/{i}.html",
+                        "displayName": f"Adidas shoe {i}",
+                        "image": {"src": f"https://img.example/{i}.jpg"},
+                    }
+                    for i in range(start, start + size)
+                ]
+            }
+        }
+    }
+
+
+def eobuwie_page(page: int, size: int) -> Dict:
+    """Page of the Eobuwie search API (pages are 1-based)."""
+    start = (page - 1) * size
+    return {
+        "products": [
+            {
+                "values": {
+                    "model": {"value": f"Sneakersy Nike {style_code(i).replace('-', ' ')}"},
+                    "final_price": {
+                        "value": {"pl_PL": {"PLN": {"amount": 349.0 + i % 300}}}
+                    },
+                    "url_key": {"value": {"pl_PL": f"sneakersy-{i}"}},
+                    "product_active": {"value": True},
+                }
+            }
+            for i in range(start, start + size)
+        ]
+    }
+
+
+def nike_page(anchor: int, size: int) -> Dict:
+    """Page of the Nike rollup threads API."""
+    return {
+        "data": {
+            "products": {
+                "products": [
+                    {
+                        "inStock": i % 10 != 0,
+                        "productType": "FOOTWEAR" if i % 7 else "APPAREL",
+                        "url": f"{{countryLang}}/t/shoe-{i}/{style_code(i)}",
+                        "price": {"currentPrice": 399.99 + i % 500, "fullPrice": 599.99},
+                        "title": f"Nike shoe {i}",
+                    }
+                    for i in range(anchor, anchor + size)
+                ]
+            }
+        }
+    }
+
+
+def stockx_page(size: int, seed: int = 0) -> Dict:
+    """StockX browse API response with `size` products."""
+    rng = random.Random(seed)
+    products: List[Dict] = []
+    for i in range(size):
+        price = rng.uniform(80, 400)
+        products.append(
+            {
+                "title": f"Sneaker {i}",
+                "gender": ("men", "women", "unisex")[i % 3],
+                "styleId": style_code(i) if i % 11 else f"{style_code(i)}/{style_code(i + 1)}",
+                "market": {
+                    "lowestAsk": round(price * 1.05, 2),
+                    "highestBid": round(price * 0.95, 2),
+                    "numberOfAsks": rng.randint(0, 200),
+                    "numberOfBids": rng.randint(0, 200),
+                    "lastSale": round(price, 2),
+                    "averageDeadstockPrice": round(price, 2),
+                    "deadstockSold": rng.randint(0, 5000),
+                    "salesLast72Hours": rng.randint(0, 50),
+                    "volatility": round(rng.uniform(0, 2), 4),
+                    "pricePremium": round(rng.uniform(-0.5, 1.5), 3),
+                    "changeValue": 0,
+                    "changePercentage": 0,
+                    "annualHigh": round(price * 1.5, 2),
+                    "annualLow": round(price * 0.7, 2),
+                },
+            }
+        )
+    return {"Products": products, "Pagination": {"total": size, "page": 1}}
@@ -0,0 +1,258 @@
+"""
+Offline benchmarks of every pipeline stage.
+
+Runs the scrapers against a local stub server and times parsing, column
+accumulation, matching, analysis and saving on fixture data. Results are
+written as JSON so runs can be compared for regressions:
+
+    python benchmarks/run.py --scale 2 --output bench_results/baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+import fixtures  # noqa: E402
+import pandas as pd  # noqa: E402
+from stub_server import StubRetailerServer  # noqa: E402
+
+from metrics import METRICS  # noqa: E402
+from result_sink import ExcelSink, FeatherSink, ParquetSink  # noqa: E402
+from scrapers._base_scraper import BaseScraper, PaginatedScraper  # noqa: E402
+from scrapers._columns import ColumnAccumulator  # noqa: E402
+from scrapers._extract import parse_page  # noqa: E402
+from scrapers._schema import RETAILER_SCHEMA  # noqa: E402
+from scrapers.adidas import Adidas  # noqa: E402
+from scrapers.eobuwie import Eobuwie  # noqa: E402
+from scrapers.nike import Nike  # noqa: E402
+from scrapers.stockx import StockX  # noqa: E402
+from shoes_purchase_analyzer import Analyzer  # noqa: E402
+from style_matching import StyleIndex  # noqa: E402
+
+RETAILERS = {"adidas": Adidas, "eobuwie": Eobuwie, "nike": Nike}
+
+
+def timed(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run `func` `repeat` times and summarize wall-clock seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "runs": repeat,
+    }
+
+
+def reset_hosts() -> None:
+    """Forget per-host limits, so each fetch run starts from a clean slate."""
+    BaseScraper._host_slots.clear()  # pylint: disable=protected-access
+    BaseScraper._host_buckets.clear()  # pylint: disable=protected-access
+    BaseScraper._host_breakers.clear()  # pylint: disable=protected-access
+
+
+def bench_fetch(args: argparse.Namespace) -> Dict[str, Any]:
+    """Full scraper runs against the stub for several in-flight windows."""
+    results: Dict[str, Any] = {}
+    with StubRetailerServer(
+        latency=args.latency,
+        depth=args.depth,
+        error_rate=args.error_rate,
+    ) as server:
+        for name, scraper_class in RETAILERS.items():
+            for window in args.windows:
+                reset_hosts()
+                scraper = scraper_class()
+                scraper.url = server.url(name)
+                scraper.max_in_flight = window
+                scraper.requests_per_second = 10_000
+                scraper.backoff_base = 0.01
+                requests_before = server.requests
+
+                stats = timed(lambda s=scraper: s.run(None), 1)
+                stats["requests"] = server.requests - requests_before
+                stats["rows"] = len(scraper.rows)
+                stats["wire_bytes"] = scraper.wire_bytes
+                stats["decoded_bytes"] = scraper.decoded_bytes
+                stats["pages_per_s"] = round(stats["requests"] / stats["min_s"], 2)
+                results[f"{name}[in_flight={window}]"] = stats
+    return results
+
+
+def retailer_pages(scale: int) -> Dict[str, List[bytes]]:
+    """Encoded fixture pages per retailer."""
+    pages = 20 * scale
+    return {
+        "adidas": [json.dumps(fixtures.adidas_page(p * 48, 48)).encode() for p in range(pages)],
+        "eobuwie": [json.dumps(fixtures.eobuwie_page(p + 1, 72)).encode() for p in range(pages)],
+        "nike": [json.dumps(fixtures.nike_page(p * 24, 24)).encode() for p in range(pages)],
+    }
+
+
+def bench_parse(pages: Dict[str, List[bytes]], repeat: int) -> Dict[str, Any]:
+    """Decode and project fixture pages through each retailer's spec."""
+    results = {}
+    for name, bodies in pages.items():
+        spec = RETAILERS[name]().spec
+        stats = timed(lambda b=bodies, s=spec: [parse_page(s, body) for body in b], repeat)
+        stats["pages"] = len(bodies)
+        stats["bytes"] = sum(len(body) for body in bodies)
+        results[name] = stats
+    return results
+
+
+def bench_concat(pages: Dict[str, List[bytes]], repeat: int) -> Dict[str, Any]:
+    """Column accumulation versus a DataFrame per page plus pd.concat."""
+    spec = Adidas().spec
+    chunks = [parse_page(spec, body) for body in pages["adidas"]] * 10
+
+    def accumulate() -> pd.DataFrame:
+        rows = ColumnAccumulator(RETAILER_SCHEMA, RETAILER_SCHEMA)
+        for chunk in chunks:
+            rows.extend(chunk)
+        return rows.to_frame()
+
+    def concat() -> pd.DataFrame:
+        return pd.concat([pd.DataFrame(chunk) for chunk in chunks])
+
+    return {
+        "accumulator": {**timed(accumulate, repeat), "pages": len(chunks)},
+        "per_page_concat": {**timed(concat, repeat), "pages": len(chunks)},
+    }
+
+
+def stockx_frame(size: int) -> pd.DataFrame:
+    """StockX fixture rows parsed and typed the way the StockX scraper does."""
+    scraper = StockX()
+    scraper.rows.extend(scraper.parse(fixtures.stockx_page(size)))
+    return scraper.rows.to_frame()
+
+
+def analysis_frames(scale: int) -> Dict[str, pd.DataFrame]:
+    """StockX catalog and retailer offers at the given scale."""
+    stockx = stockx_frame(6 * 1000 * scale)
+    rows = ColumnAccumulator(RETAILER_SCHEMA, RETAILER_SCHEMA)
+    for name, bodies in retailer_pages(scale).items():
+        spec = RETAILERS[name]().spec
+        for body in bodies:
+            rows.extend(parse_page(spec, body))
+    return {"stockx": stockx, "offers": rows.to_frame()}
+
+
+def frame_mb(df: pd.DataFrame) -> float:
+    """In-memory size of a frame, strings included."""
+    return round(df.memory_usage(deep=True).sum() / 1e6, 3)
+
+
+def bench_merge(frames: Dict[str, pd.DataFrame], repeat: int) -> Dict[str, Any]:
+    """Build the style index and match every offer against it."""
+    stats = timed(lambda: StyleIndex(frames["stockx"]).match(frames["offers"]), repeat)
+    stats["stockx_rows"] = len(frames["stockx"])
+    stats["offer_rows"] = len(frames["offers"])
+    stats["stockx_mb"] = frame_mb(frames["stockx"])
+    stats["offers_mb"] = frame_mb(frames["offers"])
+    stats["merged_mb"] = frame_mb(StyleIndex(frames["stockx"]).match(frames["offers"]))
+    return stats
+
+
+def bench_analyze(merged: pd.DataFrame, repeat: int) -> Dict[str, Any]:
+    """Analyzer.analyze on the merged frame."""
+    return {**timed(lambda: Analyzer(merged).analyze(), repeat), "rows": len(merged)}
+
+
+def check_round_trip(df: pd.DataFrame, loaded: pd.DataFrame, sink: str) -> None:
+    """Fail if a saved frame does not read back with every column and value."""
+    if list(loaded.columns) != list(df.columns) or not loaded.notna().sum().equals(
+        df.notna().sum()
+    ):
+        raise ValueError(f"{sink} did not read back the frame it saved")
+
+
+def bench_save(merged: pd.DataFrame, repeat: int) -> Dict[str, Any]:
+    """Write the merged frame with every result sink and check it reads back."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for sink_class in (ParquetSink, FeatherSink, ExcelSink):
+            sink = sink_class(directory)
+            stats = timed(lambda s=sink: s.save(merged, "merged"), repeat)
+            stats["bytes"] = sink.path("merged").stat().st_size
+            check_round_trip(merged, sink.load("merged"), sink_class.__name__)
+            results[sink_class.__name__] = stats
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1, help="fixture size multiplier")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per CPU benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub latency (s)")
+    parser.add_argument("--depth", type=int, default=20, help="stub pages per group")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stub 503 share")
+    parser.add_argument(
+        "--windows", type=int, nargs="+", default=[1, 4, 16], help="in-flight limits"
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        default=["fetch", "parse", "concat", "merge", "analyze", "save"],
+    )
+    parser.add_argument("--output", type=Path, help="JSON results file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the selected benchmarks and write the results file."""
+    args = parse_args()
+    output = args.output or ROOT.parent / "bench_results" / (
+        datetime.now().strftime("%Y%m%dT%H%M%S") + ".json"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        BaseScraper.sink = ParquetSink(directory)
+        PaginatedScraper.store = None
+        BaseScraper.cache = None
+
+        results: Dict[str, Any] = {}
+        pages = retailer_pages(args.scale)
+        frames = analysis_frames(args.scale)
+        merged = StyleIndex(frames["stockx"]).match(frames["offers"])
+
+        stages: Dict[str, Callable[[], Any]] = {
+            "fetch": lambda: bench_fetch(args),
+            "parse": lambda: bench_parse(pages, args.repeat),
+            "concat": lambda: bench_concat(pages, args.repeat),
+            "merge": lambda: bench_merge(frames, args.repeat),
+            "analyze": lambda: bench_analyze(merged, args.repeat),
+            "save": lambda: bench_save(merged, args.repeat),
+        }
+        for stage in args.stages:
+            print(f"Running {stage} benchmark...")
+            results[stage] = stages[stage]()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "results": results,
+        "metrics": METRICS.snapshot(),
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Local HTTP server imitating the retailer and StockX APIs."""
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Type
+from urllib.parse import parse_qs, urlsplit
+
+import fixtures
+
+
+class StubRetailerServer:
+    """
+    Serve fixture pages at /adidas, /eobuwie, /nike and /stockx.
+
+    Each catalog group is `depth` pages of `page_size` products deep, every
+    response is delayed by `latency` seconds and a share `error_rate` of them
+    fails with 503 and Retry-After: 0. /stockx browses `stockx_size`
+    products by gender and lowest ask range, in pages of which only the
+    first `stockx_cap` results are reachable, like the real API. Bodies are gzipped for clients
+    accepting gzip, like the real APIs do. Use as a context manager; point
+    a scraper at it with ``scraper.url = server.url("nike")``.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        depth: int = 20,
+        page_size: int = 48,
+        stockx_size: int = 1000,
+        stockx_cap: int = 1000,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.depth = depth
+        self.page_size = page_size
+        self.stockx_size = stockx_size
+        self.stockx_cap = stockx_cap
+        self._stockx = fixtures.stockx_page(stockx_size)["Products"]
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def url(self, source: str) -> str:
+        """Endpoint standing in for a source's API URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{source}"
+
+    def __enter__(self) -> "StubRetailerServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path: str, query: Dict[str, list]) -> Optional[Dict]:
+        """Payload for a request, or None to answer with an error."""
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+        time.sleep(self.latency)
+        if failed:
+            return None
+
+        size = self.page_size
+        if path == "/adidas":
+            page = int(query["start"][0]) // size
+            return fixtures.adidas_page(page * size, size if page < self.depth else 0)
+        if path == "/eobuwie":
+            page = int(query["page"][0])
+            return fixtures.eobuwie_page(page, size if page <= self.depth else 0)
+        if path == "/nike":
+            anchor = int(re.search(r"anchor=(\d+)", query["endpoint"][0]).group(1))
+            page = anchor // size
+            return fixtures.nike_page(page * size, size if page < self.depth else 0)
+        if path == "/stockx":
+            return self.browse(query)
+        return {}
+
+    def browse(self, query: Dict[str, list]) -> Dict:
+        """StockX browse API page of the products matching the query filters."""
+        products = self._stockx
+        if "gender" in query:
+            products = [p for p in products if p["gender"] == query["gender"][0]]
+        if "market.lowestAsk" in query:
+            low, high = map(float, re.findall(r"[\d.]+", query["market.lowestAsk"][0]))
+            products = [p for p in products if low <= p["market"]["lowestAsk"] < high]
+        per_page = int(query.get("resultsPerPage", ["1000"])[0])
+        page = int(query.get("page", ["1"])[0])
+        first = (page - 1) * per_page
+        reachable = products[: self.stockx_cap]
+        return {
+            "Products": reachable[first : first + per_page],
+            "Pagination": {"total": len(products), "page": page},
+        }
+
+    def _handler(self) -> Type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler delegating to the stub."""
+
+            def do_GET(self) -> None:  # noqa: N802
+                """Serve a fixture page."""
+                parts = urlsplit(self.path)
+                payload = stub.respond(parts.path, parse_qs(parts.query))
+                if payload is None:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=5)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                """Keep benchmark output quiet."""
+
+        return Handler
@@ -0,0 +1,296 @@
+"""Long-running crawler refreshing every source slice on its own adaptive schedule."""
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Union
+
+import pandas as pd
+
+from logger_module import get_logger
+from metrics import METRICS
+from opportunity_index import OpportunityIndex, liquid
+from scrapers._base_scraper import BaseScraper
+from shoes_purchase_analyzer import Analyzer
+from streaming import DealStream
+from style_matching import StyleIndex
+
+
+def change_rate(previous: Dict[str, float], current: Dict[str, float]) -> float:
+    """Share of products that appeared, disappeared or changed price between two crawls."""
+    ids = previous.keys() | current.keys()
+    if not ids:
+        return 0.0
+    return sum(previous.get(i) != current.get(i) for i in ids) / len(ids)
+
+
+class CrawlUnit:  # pylint: disable=too-many-instance-attributes
+    """
+    One independently scheduled slice of a source (a catalog group or a
+    StockX brand) and its refresh interval.
+
+    After every complete crawl the interval is scaled towards the one at
+    which `target_change` of the unit's products change between crawls: a
+    unit that changed more is polled sooner, one that did not change is
+    left alone longer, within [`min_interval`, `max_interval`].
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        source: str,
+        key: str,
+        label: str,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        target_change: float = 0.05,
+    ) -> None:
+        self.source = source
+        self.key = key
+        self.label = label
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_change = target_change
+        self.due = 0.0
+        self.prices: Optional[Dict[str, float]] = None
+
+    def observe(self, prices: Dict[str, float]) -> Optional[float]:
+        """Record a complete crawl and adapt the interval; return the change rate."""
+        previous, self.prices = self.prices, prices
+        if previous is None:
+            return None
+        rate = change_rate(previous, prices)
+        # The square root damps swings; a quiet unit backs off at most 4x per crawl.
+        factor = math.sqrt(self.target_change / max(rate, self.target_change / 16))
+        self.interval = min(
+            max(self.interval * factor, self.min_interval), self.max_interval
+        )
+        return rate
+
+    def back_off(self) -> None:
+        """Double the interval after a failed crawl, up to `max_interval`."""
+        self.interval = min(self.interval * 2, self.max_interval)
+
+    def schedule(self, now: float) -> None:
+        """Make the unit due one interval after `now`."""
+        self.due = now + self.interval
+
+
+class CrawlDaemon:  # pylint: disable=too-many-instance-attributes
+    """
+    Keep crawling every source, one thread per source, until stopped.
+
+    Scrapers are created once, so their sessions, the StockX session (and
+    browser fallback) and the StockX reference catalog stay warm between
+    crawls. Each source's units are crawled when due, earliest first;
+    retailer pages are scored as they arrive by the `stream`, and every
+    StockX refresh updates the catalog they are scored against.
+
+    With an opportunity `index`, every crawl also reprices its offers (or
+    StockX products) in the index, and the `top` best liquid opportunities
+    are rewritten to `top_path` after each crawl.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        scrapers: Dict[str, BaseScraper],
+        stream: DealStream,
+        reference: pd.DataFrame,
+        make_analyzer: Callable[[pd.DataFrame], Analyzer],
+        interval: float = 30 * 60,
+        min_interval: float = 5 * 60,
+        max_interval: float = 6 * 60 * 60,
+        target_change: float = 0.05,
+        reference_source: str = "stockx",
+        index: Optional[OpportunityIndex] = None,
+        top_path: Optional[Union[str, Path]] = None,
+        top: int = 20,
+    ) -> None:
+        self.logging = get_logger(self.__class__.__name__)
+        self.scrapers = scrapers
+        self.stream = stream
+        self.reference = reference
+        self.make_analyzer = make_analyzer
+        self.reference_source = reference_source
+        self.index = index
+        self.top_path = Path(top_path) if top_path else None
+        self.top = top
+        if index is not None:
+            index.update_products(reference)
+        self.units: Dict[str, List[CrawlUnit]] = {}
+        for name, scraper in scrapers.items():
+            labels = {
+                group: label
+                for label, group in getattr(scraper, "CATEGORIES", {}).items()
+            }
+            self.units[name] = [
+                CrawlUnit(
+                    name,
+                    key,
+                    labels.get(key, key),
+                    interval,
+                    min_interval,
+                    max_interval,
+                    target_change,
+                )
+                for key in scraper.crawl_units
+            ]
+            if name == reference_source:
+                # The reference catalog is fresh; refresh it one interval from now.
+                for unit in self.units[name]:
+                    unit.schedule(time.monotonic())
+            else:
+                scraper.on_page = stream.on_page
+        self._stop = threading.Event()
+        self._reference_lock = threading.Lock()
+        self._top_lock = threading.Lock()
+
+    def run(self) -> None:
+        """Crawl until `stop` is called."""
+        threads = [
+            threading.Thread(target=self._loop, args=(name,), name=f"daemon-{name}")
+            for name in self.scrapers
+        ]
+        for thread in threads:
+            thread.start()
+        self.logging.info(f"Daemon started for {', '.join(self.scrapers)}.")
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(1)
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join()
+            close = getattr(self.scrapers.get(self.reference_source), "close", None)
+            if close is not None:
+                close()
+            self.logging.info("Daemon stopped.")
+
+    def stop(self) -> None:
+        """Let every source finish its current crawl and exit."""
+        self._stop.set()
+
+    def _loop(self, name: str) -> None:
+        """Crawl a source's units whenever they are due."""
+        units = self.units[name]
+        while units:
+            unit = min(units, key=lambda u: u.due)
+            if self._stop.wait(max(0.0, unit.due - time.monotonic())):
+                return
+            try:
+                self._crawl(name, unit)
+            except Exception:
+                # One bad crawl must not end the source's loop for good.
+                self.logging.exception(f"{name}/{unit.label} crawl failed")
+                unit.back_off()
+            unit.schedule(time.monotonic())
+
+    def _crawl(self, name: str, unit: CrawlUnit) -> None:
+        """Crawl one unit and fold its results into the index."""
+        scraper = self.scrapers[name]
+        df = scraper.crawl([unit.key])
+        previous = unit.prices
+        partial = getattr(scraper, "partial", False)
+        if partial:
+            # Missing pages would count as delisted products.
+            self.logging.warning(
+                f"{name}/{unit.label} crawl was partial, keeping its interval."
+            )
+        else:
+            self._observe(scraper, unit, df)
+        if BaseScraper.history is not None and scraper.PRICE_COLUMN in df:
+            BaseScraper.history.record(
+                scraper.__class__.__name__,
+                df,
+                scraper.ID_COLUMN,
+                scraper.PRICE_COLUMN,
+            )
+        if name == self.reference_source:
+            delisted: Set[str] = set()
+            if previous is not None and not partial and scraper.ID_COLUMN in df:
+                delisted = self._delisted(name, unit, previous, df[scraper.ID_COLUMN])
+            self._refresh_reference(df, delisted)
+        elif self.index is not None:
+            self._index_offers(name, df, None if partial else previous)
+        self._write_top()
+
+    def _observe(self, scraper: BaseScraper, unit: CrawlUnit, df: pd.DataFrame) -> None:
+        """Adapt a unit's interval to the change since its previous crawl."""
+        if scraper.ID_COLUMN not in df or scraper.PRICE_COLUMN not in df:
+            return
+        prices = dict(zip(df[scraper.ID_COLUMN].astype(str), df[scraper.PRICE_COLUMN]))
+        rate = unit.observe(prices)
+        if rate is None:
+            return
+        METRICS.set("shoex_change_rate", rate, source=unit.source, unit=unit.label)
+        METRICS.set(
+            "shoex_refresh_interval_seconds",
+            unit.interval,
+            source=unit.source,
+            unit=unit.label,
+        )
+        self.logging.info(
+            f"{unit.source}/{unit.label}: {rate:.1%} changed, next crawl in {unit.interval / 60:.1f} min."
+        )
+
+    def _delisted(
+        self,
+        name: str,
+        unit: CrawlUnit,
+        previous: Dict[str, float],
+        ids: pd.Series,
+    ) -> Set[str]:
+        """Products a unit listed last time but not now, nor in any other unit."""
+        listed = set(ids.astype(str))
+        for other in self.units[name]:
+            if other is not unit and other.prices is not None:
+                listed.update(other.prices)
+        return previous.keys() - listed
+
+    def _refresh_reference(self, fresh: pd.DataFrame, delisted: Set[str]) -> None:
+        """
+        Replace the StockX products of a refreshed brand in the reference
+        catalog, and drop its `delisted` ones from the catalog and the index.
+        """
+        with self._reference_lock:
+            style_ids = self.reference["styleId"].astype(str)
+            stale = style_ids.isin(delisted | set(fresh["styleId"].astype(str)))
+            self.reference = pd.concat(
+                [self.reference[~stale], fresh], ignore_index=True
+            )
+            analyzer = self.make_analyzer(self.reference)
+            self.stream.set_reference(StyleIndex(self.reference), analyzer)
+        if delisted:
+            self.logging.info(f"Dropped {len(delisted)} delisted StockX products.")
+        if self.index is not None:
+            self.index.set_analyzer(analyzer)
+            for style_id in delisted:
+                self.index.remove_product(style_id)
+            self.index.update_products(fresh)
+
+    def _index_offers(
+        self, name: str, df: pd.DataFrame, previous: Optional[Dict[str, float]]
+    ) -> None:
+        """Reprice a crawled unit's offers in the index and drop the delisted ones."""
+        if "id" not in df:
+            return
+        if previous is not None:
+            for product_id in previous.keys() - set(df["id"].astype(str)):
+                self.index.remove_offer(name, product_id)
+        self.index.update_offers(name, df)
+
+    def _write_top(self) -> None:
+        """Atomically replace `top_path` with the best liquid opportunities."""
+        if self.index is None or self.top_path is None:
+            return
+        records = [o._asdict() for o in self.index.top(self.top, liquid)]
+        with self._top_lock:
+            partial = self.top_path.with_suffix(".tmp")
+            partial.write_text(
+                json.dumps(records, default=str, indent=1), encoding="utf-8"
+            )
+            os.replace(partial, self.top_path)
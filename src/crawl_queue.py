@@ -0,0 +1,338 @@
+"""Durable queue of crawl shards shared by any number of worker processes."""
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence, Set, Type
+
+import pandas as pd
+
+from logger_module import get_logger
+from metrics import METRICS
+from scrapers import create
+from scrapers._base_scraper import BaseScraper, PaginatedScraper
+from scrapers._columns import Columns, OfferAccumulator
+from scrapers._http_cache import ResponseCache
+from scrapers._schema import RETAILER_SCHEMA
+
+
+class Shard(NamedTuple):
+    """`pages` consecutive catalog pages of one group of a source."""
+
+    source: str
+    group: str
+    first_page: int
+    pages: int
+    stride: int
+
+
+class CrawlQueue:
+    """
+    SQLite queue of crawl shards: source x catalog group x page range.
+
+    `seed` puts the first `lookahead` page ranges of every group on the
+    queue. Workers `claim` a shard under a lease, crawl it and `complete` it
+    with its rows in one transaction, which also queues the range `stride`
+    pages further on unless the group ended within the shard; so each group
+    keeps `lookahead` shards in flight until its end is found. A shard whose
+    lease expires (its worker died) is handed out again, and one that keeps
+    failing is marked failed after `max_attempts`.
+
+    Everything is keyed by (source, group, first page), so seeding again,
+    completing a shard twice or merging twice never duplicates work or rows:
+    rerunning a crashed crawl only redoes the shards it had not finished.
+    Workers on several hosts can share the queue file when it lives on a
+    filesystem with working SQLite locking.
+    """
+
+    def __init__(
+        self,
+        path: str = "crawl_queue.sqlite",
+        lease: float = 5 * 60,
+        max_attempts: int = 3,
+    ) -> None:
+        """Open (or create) the queue at the given path."""
+        self.logging = get_logger(self.__class__.__name__)
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shards (
+                source TEXT NOT NULL,
+                grp TEXT NOT NULL,
+                group_index INTEGER NOT NULL,
+                first_page INTEGER NOT NULL,
+                pages INTEGER NOT NULL,
+                stride INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                ended INTEGER NOT NULL DEFAULT 0,
+                rows TEXT,
+                error TEXT,
+                PRIMARY KEY (source, grp, first_page)
+            )
+            """
+        )
+
+    def _transaction(self) -> "_Transaction":
+        """Write transaction holding the database lock from its first statement."""
+        return _Transaction(self._conn, self._lock)
+
+    def seed(
+        self,
+        source: str,
+        groups: Sequence[str],
+        pages_per_shard: int = 10,
+        lookahead: int = 4,
+    ) -> int:
+        """Queue the first shards of every group of a source; return how many were new."""
+        stride = pages_per_shard * lookahead
+        rows = [
+            (source, group, index, shard * pages_per_shard, pages_per_shard, stride)
+            for index, group in enumerate(groups)
+            for shard in range(lookahead)
+        ]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO shards (source, grp, group_index, first_page, pages, stride)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            added = conn.total_changes - before
+        self.logging.info(
+            f"{source}: queued {added} new shards of {len(groups)} groups."
+        )
+        return added
+
+    def claim(self, worker: str) -> Optional[Shard]:
+        """Lease the next pending (or abandoned) shard, earliest pages first."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                """
+                SELECT source, grp, first_page, pages, stride FROM shards
+                WHERE status = 'pending' OR (status = 'running' AND lease_until < ?)
+                ORDER BY first_page, group_index, source
+                LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE shards SET status = 'running', worker = ?, lease_until = ?
+                WHERE source = ? AND grp = ? AND first_page = ?
+                """,
+                (worker, now + self.lease, *row[:3]),
+            )
+        return Shard(*row)
+
+    def complete(self, shard: Shard, rows: Columns, ended: bool) -> None:
+        """Checkpoint a crawled shard and queue the next range of its group."""
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                UPDATE shards SET status = 'done', ended = ?, rows = ?, error = NULL
+                WHERE source = ? AND grp = ? AND first_page = ? AND status != 'done'
+                """,
+                (ended, json.dumps(rows), shard.source, shard.group, shard.first_page),
+            )
+            if not ended:
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO shards (source, grp, group_index, first_page, pages, stride)
+                    SELECT source, grp, group_index, first_page + stride, pages, stride
+                    FROM shards WHERE source = ? AND grp = ? AND first_page = ?
+                    """,
+                    (shard.source, shard.group, shard.first_page),
+                )
+        METRICS.inc("shoex_shards_total", source=shard.source, status="done")
+
+    def fail(self, shard: Shard, error: str) -> None:
+        """Give a shard back to the queue, or mark it failed after `max_attempts`."""
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                UPDATE shards SET
+                    attempts = attempts + 1,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                    error = ?
+                WHERE source = ? AND grp = ? AND first_page = ? AND status = 'running'
+                """,
+                (
+                    self.max_attempts,
+                    error,
+                    shard.source,
+                    shard.group,
+                    shard.first_page,
+                ),
+            )
+        METRICS.inc("shoex_shards_total", source=shard.source, status="error")
+        self.logging.error(
+            f"Shard {shard.source}/{shard.group}@{shard.first_page} failed: {error}"
+        )
+
+    def progress(self, source: Optional[str] = None) -> Dict[str, int]:
+        """Number of shards in each status, for one source or all of them."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT status, COUNT(*) FROM shards
+                WHERE ? IS NULL OR source = ?
+                GROUP BY status
+                """,
+                (source, source),
+            ).fetchall()
+        return dict(rows)
+
+    def groups(self, source: str) -> Set[str]:
+        """Groups of a source with shards on the queue."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT grp FROM shards WHERE source = ?", (source,)
+            ).fetchall()
+        return {group for (group,) in rows}
+
+    def drained(self) -> bool:
+        """Whether every shard is either done or failed."""
+        progress = self.progress()
+        return not progress.get("pending") and not progress.get("running")
+
+    def merge(self, source: str) -> pd.DataFrame:
+        """
+        Rows of every completed shard of a source, in catalog order, one per
+        product id (the cheapest offer). Pages past the end of a group,
+        crawled by shards queued ahead, are empty, so merging never depends
+        on which worker did what.
+        """
+        rows = OfferAccumulator(RETAILER_SCHEMA, RETAILER_SCHEMA)
+        with self._lock:
+            shards = self._conn.execute(
+                """
+                SELECT rows FROM shards WHERE source = ? AND status = 'done'
+                ORDER BY group_index, first_page
+                """,
+                (source,),
+            ).fetchall()
+        for (chunk,) in shards:
+            rows.extend(json.loads(chunk))
+        return rows.to_frame()
+
+    def clear(self, source: Optional[str] = None) -> None:
+        """Forget the shards of a merged crawl, for one source or all of them."""
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM shards WHERE ? IS NULL OR source = ?", (source, source)
+            )
+
+
+class _Transaction:
+    """`BEGIN IMMEDIATE` ... `COMMIT` block, rolled back on errors."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock) -> None:
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        try:
+            self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self.lock.release()
+
+
+def work(  # pylint: disable=too-many-arguments
+    path: str,
+    cache: bool = False,
+    poll: float = 1.0,
+    http2: bool = False,
+    parse_workers: int = 0,
+    rates: Optional[Mapping[str, float]] = None,
+) -> int:
+    """
+    Crawl shards from the queue at `path` until it is drained.
+    Meant to run in its own process; return the number of shards completed.
+    `http2`, `parse_workers` and the per-source request `rates` carry the
+    crawl settings of the process that queued the shards.
+    """
+    logger = get_logger("CrawlWorker")
+    queue = CrawlQueue(path)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    if cache:
+        BaseScraper.cache = ResponseCache()
+    BaseScraper.http2 = http2
+    if parse_workers > 0:
+        PaginatedScraper.parse_pool = ProcessPoolExecutor(
+            parse_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    try:
+        completed = _crawl_shards(queue, worker, poll, rates or {})
+    finally:
+        if PaginatedScraper.parse_pool is not None:
+            PaginatedScraper.parse_pool.shutdown()
+            PaginatedScraper.parse_pool = None
+    logger.info(f"Worker {worker} completed {completed} shards.")
+    return completed
+
+
+def _crawl_shards(
+    queue: CrawlQueue, worker: str, poll: float, rates: Mapping[str, float]
+) -> int:
+    """Claim, crawl and complete shards until the queue is drained."""
+    scrapers: Dict[str, PaginatedScraper] = {}
+    completed = 0
+    while True:
+        shard = queue.claim(worker)
+        if shard is None:
+            if queue.drained():
+                break
+            # Other workers still hold leases that may expire or queue more.
+            time.sleep(poll)
+            continue
+
+        if shard.source not in scrapers:
+            scrapers[shard.source] = create(shard.source)
+            if shard.source in rates:
+                scrapers[shard.source].requests_per_second = rates[shard.source]
+        try:
+            rows, ended = scrapers[shard.source].crawl_shard(
+                shard.group, shard.first_page, shard.pages
+            )
+            queue.complete(shard, rows, ended)
+        except Exception as e:
+            # Parse or storage errors count as attempts too, so a shard that
+            # always breaks ends up failed instead of being handed out forever.
+            queue.fail(shard, repr(e))
+            continue
+        completed += 1
+    return completed
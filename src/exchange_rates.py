@@ -0,0 +1,155 @@
+"""NBP exchange rates cached on disk and refreshed in the background."""
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import requests
+
+from logger_module import get_logger
+
+# Used when no rate has ever been fetched, e.g. on a first offline run.
+DEFAULT_USD_TO_PLN = 4.0
+
+NBP_API = "https://api.nbp.pl/api/exchangerates/rates/A"
+
+
+class ExchangeRateProvider:  # pylint: disable=too-many-instance-attributes
+    """
+    Daily NBP mid rates of one currency against PLN.
+
+    Rates are kept in ``<directory>/<currency>.json`` by effective date.
+    `prefetch` refreshes them from the NBP API on a background thread, so
+    `rate` never waits on the network: it answers from what is cached, with
+    the last published rate on or before the requested day (NBP does not
+    publish on weekends and holidays). Rates older than `max_staleness` are
+    still served, with a warning, so analysis keeps working offline.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        currency: str = "USD",
+        directory: Union[str, Path] = "fx_cache",
+        ttl: float = 6 * 60 * 60,
+        max_staleness: timedelta = timedelta(days=4),
+        timeout: float = 10,
+    ) -> None:
+        self.logging = get_logger(self.__class__.__name__)
+        self.currency = currency.upper()
+        self.path = Path(directory) / f"{self.currency}.json"
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.timeout = timeout
+        self.fetched_at = 0.0
+        self.rates: Dict[str, float] = {}
+        self._dates: List[str] = []
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._load()
+
+    def prefetch(self, *days: date) -> None:
+        """
+        Start refreshing the cache in the background.
+        The latest rates are fetched once the cache is older than `ttl`, and
+        history around each of `days` if it is not cached yet.
+        """
+        missing = [day for day in days if not self.covers(day)]
+        if not missing and not self.is_stale():
+            return
+        self._worker = threading.Thread(
+            target=self.refresh, args=missing, name=f"fx-{self.currency}", daemon=True
+        )
+        self._worker.start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait up to `timeout` seconds for a running prefetch to finish."""
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def refresh(self, *days: date) -> None:
+        """Fetch the latest rates (when stale) and history around `days`."""
+        ranges = [(day - self.max_staleness, min(day, date.today())) for day in days]
+        fetched: Dict[str, float] = {}
+        latest = False
+        try:
+            if self.is_stale():
+                fetched.update(self._fetch(f"{NBP_API}/{self.currency}/last/30/"))
+                latest = True
+            for start, end in ranges:
+                fetched.update(
+                    self._fetch(
+                        f"{NBP_API}/{self.currency}/{start:%Y-%m-%d}/{end:%Y-%m-%d}/"
+                    )
+                )
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            self.logging.warning(f"Failed to refresh {self.currency} rates: {e}")
+        if fetched:
+            self._store(fetched, latest)
+
+    def is_stale(self) -> bool:
+        """Whether the latest rates were fetched more than `ttl` ago."""
+        return time.time() - self.fetched_at >= self.ttl
+
+    def covers(self, day: date) -> bool:
+        """Whether a rate published within `max_staleness` before `day` is cached."""
+        published = self._published_on_or_before(day)
+        return published is not None and day - published <= self.max_staleness
+
+    def rate(self, day: Optional[date] = None) -> float:
+        """Mid rate in PLN on `day` (today by default), from the cache only."""
+        day = day or date.today()
+        published = self._published_on_or_before(day)
+        if published is None:
+            self.logging.warning(
+                f"No cached {self.currency} rate for {day}, using {DEFAULT_USD_TO_PLN}."
+            )
+            return DEFAULT_USD_TO_PLN
+
+        if day - published > self.max_staleness:
+            self.logging.warning(
+                f"{self.currency} rate for {day} is stale, using the one of {published}."
+            )
+        return self.rates[published.isoformat()]
+
+    def _published_on_or_before(self, day: date) -> Optional[date]:
+        with self._lock:
+            index = bisect.bisect_right(self._dates, day.isoformat())
+            return date.fromisoformat(self._dates[index - 1]) if index else None
+
+    def _fetch(self, url: str) -> Dict[str, float]:
+        """Rates of an NBP API range query by effective date; empty if none."""
+        r = requests.get(url, params={"format": "json"}, timeout=self.timeout)
+        if r.status_code == 404:
+            return {}
+        r.raise_for_status()
+        return {item["effectiveDate"]: float(item["mid"]) for item in r.json()["rates"]}
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.fetched_at = data.get("fetched_at", 0.0)
+        self.rates = data.get("rates", {})
+        self._dates = sorted(self.rates)
+
+    def _store(self, fetched: Dict[str, float], latest: bool) -> None:
+        """Merge fetched rates into the cache and persist it atomically."""
+        with self._lock:
+            self.rates = {**self.rates, **fetched}
+            self._dates = sorted(self.rates)
+            if latest:
+                self.fetched_at = time.time()
+            data = json.dumps({"fetched_at": self.fetched_at, "rates": self.rates})
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.logging.info(
+            f"Cached {len(fetched)} {self.currency} rates in {self.path}."
+        )
@@ -1,24 +1,76 @@
 """Module to generate logger"""
+import atexit
 import logging
 import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
 
+LOG_DIRECTORY = "logs"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-def get_logger(class_name: str = "MAIN") -> logging.Logger:
-    """Generate and return a logger object for a given class name."""
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
 
-    logger = logging.getLogger(class_name)
 
-    # Ensure the logs directory exists
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
+class PerLoggerFileHandler(logging.Handler):
+    """Write each logger's records to `<directory>/<logger name>.log`."""
 
-    # Create a file handler for the logger
-    file_handler = logging.FileHandler(f"logs/{class_name}.log")
-    file_handler.setFormatter(
-        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    )
+    def __init__(self, directory: str = LOG_DIRECTORY) -> None:
+        super().__init__()
+        self.directory = directory
+        self._files: Dict[str, logging.FileHandler] = {}
 
-    logger.addHandler(file_handler)
-    logger.setLevel(logging.INFO)
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self._files.get(record.name)
+        if handler is None:
+            os.makedirs(self.directory, exist_ok=True)
+            handler = logging.FileHandler(
+                os.path.join(self.directory, f"{record.name}.log")
+            )
+            handler.setFormatter(self.formatter)
+            self._files[record.name] = handler
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self._files.values():
+            handler.close()
+        super().close()
+
+
+def configure_logging(directory: str = LOG_DIRECTORY) -> QueueListener:
+    """
+    Route every log record through an in-memory queue, once per process.
+
+    Callers only pay for putting a record on the queue; a listener thread
+    writes it to the logger's file (and errors to stderr) in the background.
+    """
+    global _listener  # pylint: disable=global-statement
 
+    with _configure_lock:
+        if _listener is None:
+            formatter = logging.Formatter(LOG_FORMAT)
+            files = PerLoggerFileHandler(directory)
+            files.setFormatter(formatter)
+            console = logging.StreamHandler(sys.stderr)
+            console.setFormatter(formatter)
+            console.setLevel(logging.ERROR)
+
+            records: queue.Queue = queue.Queue()
+            logging.getLogger().addHandler(QueueHandler(records))
+            _listener = QueueListener(
+                records, files, console, respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(_listener.stop)
+        return _listener
+
+
+def get_logger(class_name: str = "MAIN") -> logging.Logger:
+    """Generate and return a logger object for a given class name."""
+    configure_logging()
+    logger = logging.getLogger(class_name)
+    logger.setLevel(logging.INFO)
     return logger
@@ -1,33 +1,59 @@
 """Main runner for the scraper application."""
 
+import argparse
+import asyncio
+import multiprocessing
+import signal
 import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
 from queue import Queue
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
+from crawl_daemon import CrawlDaemon
+from crawl_queue import CrawlQueue, work
+from exchange_rates import ExchangeRateProvider
 from logger_module import get_logger
-from scrapers.adidas import Adidas
-from scrapers.eobuwie import Eobuwie
-from scrapers.nike import Nike
-from scrapers.stockx import StockX
+from metrics import METRICS
+from opportunity_index import OpportunityIndex
+from price_history import PriceHistory
+from product_store import ProductStore
+from result_sink import ExcelSink, FeatherSink, ParquetSink, ResultSink
+from scrapers import available, create
+from scrapers._base_scraper import BaseScraper, PaginatedScraper
+from scrapers._http_cache import ResponseCache
+from scrapers._schema import RETAILER_SCHEMA
 from shoes_purchase_analyzer import Analyzer
+from streaming import DealStream
+from style_matching import StyleIndex
 
 # Initialize logging
 logger = get_logger()
 
-# Initialize scraper instances
-scrapers = (
-    StockX(),
-    Nike(),
-    Eobuwie(),
-    Adidas(),
-)
+
+def build_scrapers(
+    sources: Sequence[str],
+    brands: Optional[Sequence[str]] = None,
+    categories: Optional[Sequence[str]] = None,
+) -> List[BaseScraper]:
+    """
+    Instantiate the scrapers of the given sources, narrowed to some brands
+    and categories. Only the modules of these sources get imported.
+    """
+    scrapers = []
+    for name in sources:
+        scraper = create(name)
+        scraper.configure(brands=brands, categories=categories)
+        scrapers.append(scraper)
+    return scrapers
 
 
-def run_scrapers() -> Tuple[pd.DataFrame, pd.DataFrame]:
+def run_scrapers(selected: Sequence[BaseScraper]) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Run all scraper instances in separate threads.
+    Run the selected scraper instances in separate threads.
     Collect their DataFrame results in a queue.
     Return DataFrames for StockX and other scrapers.
     """
@@ -35,7 +61,7 @@ def run_scrapers() -> Tuple[pd.DataFrame, pd.DataFrame]:
     dfs_queue: Queue = Queue()
 
     # Start threads for each scraper
-    threads = [threading.Thread(target=s.run, args=(dfs_queue,)) for s in scrapers]
+    threads = [threading.Thread(target=s.run, args=(dfs_queue,)) for s in selected]
     for thread in threads:
         thread.start()
         logger.info(f"Started thread for scraper {thread.name}")
@@ -47,48 +73,624 @@ def run_scrapers() -> Tuple[pd.DataFrame, pd.DataFrame]:
 
     logger.info("All scraper threads completed.")
 
+    return collect_results(dfs_queue)
+
+
+async def run_scrapers_async(
+    selected: Sequence[BaseScraper],
+    max_connections: int = 100,
+    max_in_flight: Optional[int] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run the selected scraper instances on a single event loop.
+    Every page request shares one aiohttp connection pool capped at
+    `max_connections`; `max_in_flight` overrides each scraper's page window.
+    Return DataFrames for StockX and other scrapers.
+    """
+    import aiohttp  # pylint: disable=import-outside-toplevel
+
+    logger.info("Starting scrapers on the event loop.")
+    dfs_queue: Queue = Queue()
+
+    if max_in_flight is not None:
+        for scraper in selected:
+            scraper.max_in_flight = max_in_flight
+
+    # No more connections than pages can be in flight at once.
+    in_flight = sum(scraper.max_in_flight for scraper in selected)
+    connector = aiohttp.TCPConnector(limit=max(1, min(max_connections, in_flight)))
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(s.arun(session, dfs_queue) for s in selected))
+
+    logger.info("All scrapers completed.")
+
+    return collect_results(dfs_queue)
+
+
+def collect_results(dfs_queue: Queue) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Drain scraper results from the queue.
+    Return DataFrames for StockX and other scrapers.
+    """
     # Collect DataFrames from queue into a dictionary
     dfs_dict: Dict[str, pd.DataFrame] = {}
     while not dfs_queue.empty():
         name, df = dfs_queue.get()
         dfs_dict[name] = df
+        METRICS.set("shoex_result_queue_depth", dfs_queue.qsize())
         logger.info(f"Collected DataFrame for {name}")
 
     # Separate StockX DataFrame from other scrapers
     df_stockx = dfs_dict.get("StockX")
-    df_scrapers = pd.concat([df for name, df in dfs_dict.items() if name != "StockX"])
+    retailers = [df for name, df in dfs_dict.items() if name != "StockX"]
+    df_scrapers = (
+        pd.concat(retailers)
+        if retailers
+        else pd.DataFrame(columns=list(RETAILER_SCHEMA)).astype(RETAILER_SCHEMA)
+    )
 
     logger.info("DataFrames separated.")
     return df_stockx, df_scrapers
 
 
+def run_queued(  # pylint: disable=too-many-arguments,too-many-locals
+    named: Dict[str, BaseScraper],
+    queue: CrawlQueue,
+    workers: int = 2,
+    pages_per_shard: int = 10,
+    cache: bool = False,
+    parse_workers: int = 0,
+    wait_timeout: float = 600.0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Crawl the paginated scrapers shard by shard through a work queue.
+
+    Their groups are seeded on the queue and crawled by `workers` local
+    processes, which workers on other hosts may join, while the other
+    scrapers run in this process. Shards completed before a crash stay on the
+    queue, so running again resumes the crawl. Local workers crawl with this
+    process's HTTP/2, request rate and `parse_workers` settings. Once the
+    queue is drained, every source's shards are merged and published as usual.
+    Raise TimeoutError if no shard changes state for `wait_timeout` seconds
+    while waiting on other hosts' workers.
+    """
+    paginated = {
+        name: scraper
+        for name, scraper in named.items()
+        if isinstance(scraper, PaginatedScraper)
+    }
+    rates = {name: scraper.requests_per_second for name, scraper in paginated.items()}
+    for name, scraper in paginated.items():
+        queue.seed(name, scraper.crawl_groups, pages_per_shard)
+
+    dfs_queue: Queue = Queue()
+    threads = [
+        threading.Thread(target=scraper.run, args=(dfs_queue,))
+        for name, scraper in named.items()
+        if name not in paginated
+    ]
+    for thread in threads:
+        thread.start()
+
+    if workers > 0:
+        logger.info(f"Crawling shards of {queue.path} in {workers} worker processes.")
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = [
+                pool.submit(
+                    work,
+                    queue.path,
+                    cache,
+                    http2=BaseScraper.http2,
+                    parse_workers=parse_workers,
+                    rates=rates,
+                )
+                for _ in range(workers)
+            ]
+            completed = sum(future.result() for future in futures)
+        logger.info(f"Local workers completed {completed} shards.")
+    last_progress: Dict[str, int] = {}
+    idle_since = time.monotonic()
+    while not queue.drained():
+        # Workers on other hosts are still crawling.
+        progress = queue.progress()
+        if progress != last_progress:
+            last_progress, idle_since = progress, time.monotonic()
+        elif time.monotonic() - idle_since > wait_timeout:
+            raise TimeoutError(
+                f"No worker made progress on {queue.path} for {wait_timeout:.0f} s; "
+                "start --worker hosts or use --workers N."
+            )
+        time.sleep(1)
+    for thread in threads:
+        thread.join()
+
+    for name, scraper in paginated.items():
+        scraper.rows.extend(queue.merge(name).to_dict("list"))
+        # Shards of a failed range, or a queue seeded with only some groups
+        # (e.g. by another host's --categories), leave the catalog partial.
+        failed = bool(queue.progress(name).get("failed"))
+        scraper.partial = failed or not set(scraper.groups) <= queue.groups(name)
+        scraper.publish(dfs_queue)
+        # Other sources on a shared queue belong to other runs.
+        queue.clear(name)
+
+    logger.info("All scrapers completed.")
+    return collect_results(dfs_queue)
+
+
+def stockx_reference(
+    sink: ResultSink,
+    max_age: timedelta,
+    brands: Optional[Sequence[str]] = None,
+    scraper: Optional[BaseScraper] = None,
+) -> pd.DataFrame:
+    """
+    StockX catalog to match retailer offers against: the latest stored one
+    when it is younger than `max_age`, otherwise a fresh crawl by `scraper`
+    (a new StockX scraper by default).
+    """
+    try:
+        run_id = sink.latest_run("StockX")
+        if datetime.now() - sink.run_time(run_id) <= max_age:
+            logger.info(f"Using the StockX catalog of run {run_id}.")
+            return sink.load("StockX", run_id)
+    except FileNotFoundError:
+        pass
+
+    logger.info("Scraping the StockX catalog before the retailers.")
+    dfs_queue: Queue = Queue()
+    (scraper or build_scrapers(["stockx"], brands)[0]).run(dfs_queue)
+    return dfs_queue.get()[1]
+
+
 def merge_dataframes(
     df_stockx: pd.DataFrame, df_scrapers: pd.DataFrame
 ) -> pd.DataFrame:
     """
     Merge StockX DataFrame with other scrapers' DataFrames.
+    Offers are matched on normalized style codes through a `StyleIndex`.
     """
     logger.info("Merging DataFrames.")
-    return df_stockx.merge(df_scrapers, how="left", left_on="styleId", right_on="id")
+    return StyleIndex(df_stockx).match(df_scrapers)
+
 
+SINKS = {"parquet": ParquetSink, "feather": FeatherSink}
 
-def main() -> None:
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        choices=available(),
+        default=available(),
+        metavar="SOURCE",
+        help=f"sources to scrape (default: all of {', '.join(available())})",
+    )
+    parser.add_argument(
+        "--brands",
+        nargs="+",
+        metavar="BRAND",
+        help="StockX brands to search (default: jordan, nike, adidas, reebok, puma, new balance)",
+    )
+    parser.add_argument(
+        "--categories",
+        nargs="+",
+        metavar="CATEGORY",
+        help="retailer categories to crawl, e.g. men women (default: all)",
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="run all scrapers on a single asyncio event loop",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="multiplex HTTPS requests over HTTP/2 where hosts support it (needs httpx[http2])",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="serve catalog pages from the on-disk HTTP cache while fresh",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only refresh products changed since the last run",
+    )
+    parser.add_argument(
+        "--full-crawl-hours",
+        type=float,
+        default=24.0,
+        metavar="HOURS",
+        help="with --incremental, crawl every page again once the last full crawl is this old (default: 24)",
+    )
+    parser.add_argument(
+        "--all-offers",
+        action="store_true",
+        help="besides the cheapest offer per product, save every listed offer "
+        "(duplicates included) as <Name>_offers",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="decode catalog pages in N worker processes (0 parses in-thread)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(SINKS),
+        default="parquet",
+        help="storage format of scraped and analyzed results",
+    )
+    parser.add_argument(
+        "--excel-report",
+        action="store_true",
+        help="also export the analysis result as an Excel report",
+    )
+    parser.add_argument(
+        "--reanalyze",
+        nargs="?",
+        const="latest",
+        metavar="RUN_ID",
+        help="skip scraping and analyze a stored run (the latest by default)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="score retailer pages against StockX while scraping and publish "
+        "deals to results/deals/ as they are found",
+    )
+    parser.add_argument(
+        "--stockx-max-age",
+        type=float,
+        default=24,
+        metavar="HOURS",
+        help="reuse a stored StockX catalog up to this old in --stream mode, "
+        "or when stockx is not among --sources",
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="record every observed price in price_history.sqlite and add trend signals",
+    )
+    parser.add_argument(
+        "--min-trend",
+        type=float,
+        metavar="PCT",
+        help="only keep StockX products whose price changed at least PCT (e.g. -0.05) "
+        "over the last 30 days of history",
+    )
+    parser.add_argument(
+        "--max-trend-volatility",
+        type=float,
+        metavar="STD",
+        help="only keep StockX products whose history volatility is at most STD",
+    )
+    parser.add_argument(
+        "--seller-levels",
+        type=int,
+        nargs="+",
+        metavar="LEVEL",
+        help="also evaluate profits for these StockX seller levels (1-5)",
+    )
+    parser.add_argument(
+        "--usd-to-pln",
+        type=float,
+        nargs="+",
+        metavar="RATE",
+        help="also evaluate profits for these USD to PLN exchange rates",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep crawling every source, brand and category on its own adaptive "
+        "schedule and stream deals until interrupted",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30,
+        metavar="MINUTES",
+        help="initial --daemon refresh interval of every source slice",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=5,
+        metavar="MINUTES",
+        help="shortest --daemon refresh interval, for fast-changing slices",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=6 * 60,
+        metavar="MINUTES",
+        help="longest --daemon refresh interval, for slices that do not change",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=0,
+        metavar="K",
+        help="in --daemon mode, keep the K most profitable liquid opportunities ranked "
+        "as prices change and rewrite them to top.json next to deals.jsonl",
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="PATH",
+        help="crawl retailers in shards through the SQLite work queue at PATH; "
+        "rerun to resume an interrupted crawl",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        metavar="N",
+        help="local worker processes crawling --queue shards (0: only other hosts' workers)",
+    )
+    parser.add_argument(
+        "--queue-timeout",
+        type=float,
+        default=600.0,
+        metavar="SECONDS",
+        help="give up on --queue when no shard progresses for this long (default: 600)",
+    )
+    parser.add_argument(
+        "--pages-per-shard",
+        type=int,
+        default=10,
+        metavar="N",
+        help="catalog pages per --queue shard",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="only crawl shards of --queue until it is drained, e.g. on another host",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="write run metrics to PATH (JSON for .json, Prometheus text otherwise)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve live metrics on http://127.0.0.1:PORT/metrics during the run",
+    )
+    args = parser.parse_args(argv)
+    if args.worker and not args.queue:
+        parser.error("--worker needs --queue")
+    if args.queue and args.stream:
+        parser.error("--stream cannot score pages crawled by --queue workers")
+    if args.top and not args.daemon:
+        parser.error("--top needs --daemon")
+    if args.daemon and (args.queue or args.reanalyze):
+        parser.error("--daemon cannot be combined with --queue or --reanalyze")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Main function to run scraper threads, merge DataFrames, and analyze results.
     """
+    args = parse_args(argv)
     logger.info("Main function started.")
 
-    df_stockx, df_scrapers = run_scrapers()
-    df_merged = merge_dataframes(df_stockx, df_scrapers)
-    df_merged.to_excel("merged.xlsx", index=False)
+    if args.metrics_port:
+        METRICS.serve(args.metrics_port)
+        logger.info(f"Serving metrics on port {args.metrics_port}.")
+
+    try:
+        if args.worker:
+            work(
+                args.queue,
+                args.cache,
+                http2=args.http2,
+                parse_workers=args.parse_workers,
+            )
+        else:
+            run(args)
+    finally:
+        if args.metrics:
+            logger.info(f"Metrics written to {METRICS.write(args.metrics)}.")
+
+
+def run_daemon(
+    args: argparse.Namespace, sink: ResultSink, rates: ExchangeRateProvider
+) -> None:
+    """Keep the selected sources fresh and stream their deals until interrupted."""
+    scrapers = dict(
+        zip(args.sources, build_scrapers(args.sources, args.brands, args.categories))
+    )
+    df_reference = stockx_reference(
+        sink, timedelta(hours=args.stockx_max_age), args.brands, scrapers.get("stockx")
+    )
+
+    def analyzer_for(df: pd.DataFrame) -> Analyzer:
+        rates.prefetch()
+        return make_analyzer(args, df, rates)
+
+    stream = DealStream(
+        StyleIndex(df_reference),
+        analyzer_for(df_reference),
+        sink.root / "deals" / f"run={sink.run_id}" / "deals.jsonl",
+    )
+    minute = 60
+    daemon = CrawlDaemon(
+        scrapers,
+        stream,
+        df_reference,
+        analyzer_for,
+        interval=args.interval * minute,
+        min_interval=args.min_interval * minute,
+        max_interval=args.max_interval * minute,
+        index=OpportunityIndex(stream.analyzer) if args.top else None,
+        top_path=stream.path.with_name("top.json"),
+        top=args.top,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    logger.info(f"Streaming deals to {stream.path}")
+    if args.top:
+        logger.info(f"Keeping the top {args.top} opportunities in {daemon.top_path}")
+    try:
+        daemon.run()
+    finally:
+        stream.close()
+
+
+def make_analyzer(
+    args: argparse.Namespace,
+    df: pd.DataFrame,
+    rates: ExchangeRateProvider,
+    valuation_date: Optional[date] = None,
+) -> Analyzer:
+    """Analyzer configured from the command line."""
+    analyzer = Analyzer(df, rates, valuation_date, BaseScraper.history)
+    analyzer.min_trend_pct = args.min_trend
+    analyzer.max_trend_volatility = args.max_trend_volatility
+    return analyzer
+
+
+def run(args: argparse.Namespace) -> None:
+    """Scrape (or load a stored run), merge, analyze and save the results."""
+    # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    sink: ResultSink = SINKS[args.format]()
+    BaseScraper.sink = sink
+    rates = ExchangeRateProvider()
+    valuation_date = None
+    if (
+        args.history
+        or args.min_trend is not None
+        or args.max_trend_volatility is not None
+    ):
+        BaseScraper.history = PriceHistory()
+        logger.info(f"Recording price history in {BaseScraper.history.path}")
+
+    BaseScraper.http2 = args.http2
+
+    if args.daemon:
+        if args.cache:
+            BaseScraper.cache = ResponseCache()
+        run_daemon(args, sink, rates)
+        return
+
+    if args.reanalyze:
+        run_id = (
+            sink.latest_run("merged") if args.reanalyze == "latest" else args.reanalyze
+        )
+        # Value a stored run at the exchange rate of the day it was scraped.
+        valuation_date = sink.run_time(run_id).date()
+        rates.prefetch(valuation_date)
+        df_merged = sink.load("merged", run_id)
+        logger.info(f"Loaded merged results of run {run_id}.")
+        rates.wait(rates.timeout)
+    else:
+        # Exchange rates are refreshed in the background while scraping.
+        rates.prefetch()
+
+        if args.cache:
+            BaseScraper.cache = ResponseCache()
+            logger.info(f"Using HTTP response cache in {BaseScraper.cache.directory}")
+
+        if args.incremental:
+            PaginatedScraper.store = ProductStore()
+            PaginatedScraper.full_crawl_interval = args.full_crawl_hours * 60 * 60
+            logger.info(
+                f"Incremental crawl using product store {PaginatedScraper.store.path}"
+            )
+
+        if args.all_offers:
+            PaginatedScraper.all_offers = True
+
+        df_reference = None
+        sources = list(args.sources)
+        if args.stream or "stockx" not in sources:
+            # The StockX catalog has to be known before retailer offers arrive.
+            df_reference = stockx_reference(
+                sink, timedelta(hours=args.stockx_max_age), args.brands
+            )
+            sources = [name for name in sources if name != "stockx"]
+        selected = build_scrapers(sources, args.brands, args.categories)
+
+        stream = None
+        if args.stream:
+            stream = DealStream(
+                StyleIndex(df_reference),
+                make_analyzer(args, df_reference, rates),
+                sink.root / "deals" / f"run={sink.run_id}" / "deals.jsonl",
+            )
+            for scraper in selected:
+                if isinstance(scraper, PaginatedScraper):
+                    scraper.on_page = stream.on_page
+            logger.info(f"Streaming deals to {stream.path}")
+
+        try:
+            if args.parse_workers > 0 and not args.queue:
+                # Spawned, not forked: this process already runs crawl and
+                # logging threads whose locks a fork would copy mid-use.
+                # Queued shards are parsed by the workers' own pools.
+                PaginatedScraper.parse_pool = ProcessPoolExecutor(
+                    args.parse_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Parsing pages in {args.parse_workers} worker processes.")
+            with METRICS.time("shoex_stage_seconds", stage="scrape"):
+                if args.queue:
+                    df_stockx, df_scrapers = run_queued(
+                        dict(zip(sources, selected)),
+                        CrawlQueue(args.queue),
+                        args.workers,
+                        args.pages_per_shard,
+                        args.cache,
+                        args.parse_workers,
+                        args.queue_timeout,
+                    )
+                elif args.asyncio:
+                    df_stockx, df_scrapers = asyncio.run(run_scrapers_async(selected))
+                else:
+                    df_stockx, df_scrapers = run_scrapers(selected)
+        finally:
+            if PaginatedScraper.parse_pool is not None:
+                PaginatedScraper.parse_pool.shutdown()
+                PaginatedScraper.parse_pool = None
+            if stream is not None:
+                stream.close()
+        if df_reference is not None:
+            df_stockx = df_reference
+        with METRICS.time("shoex_stage_seconds", stage="merge"):
+            df_merged = merge_dataframes(df_stockx, df_scrapers)
+        with METRICS.time("shoex_stage_seconds", stage="save"):
+            sink.save(df_merged, "merged")
+
+        logger.info("DataFrames merged.")
+
+    logger.info("Starting analysis.")
+
+    analyzer = make_analyzer(args, df_merged, rates, valuation_date)
+    with METRICS.time("shoex_stage_seconds", stage="analyze"):
+        df_analyzed = analyzer.analyze()
+    with METRICS.time("shoex_stage_seconds", stage="save"):
+        result_path = sink.save(df_analyzed, "result")
 
-    logger.info("DataFrames merged. Starting analysis.")
+    if args.seller_levels or args.usd_to_pln:
+        scenarios = analyzer.scenario_grid(
+            seller_levels=args.seller_levels or (1,), usd_to_pln=args.usd_to_pln
+        )
+        with METRICS.time("shoex_stage_seconds", stage="scenarios"):
+            df_scenarios = analyzer.analyze_scenarios(scenarios)
+        sink.save(scenarios, "scenarios")
+        sink.save(df_scenarios, "scenario_result")
 
-    analyzer = Analyzer(df_merged)
-    df_analyzed = analyzer.analyze()
-    df_analyzed.to_excel("result.xlsx", index=False)
+    if args.excel_report:
+        result_path = ExcelSink(sink.root, sink.run_id).save(df_analyzed, "result")
 
-    logger.info("Analysis complete. Results saved to result.xlsx.")
+    logger.info(f"Analysis complete. Results saved to {result_path}.")
 
 
 if __name__ == "__main__":
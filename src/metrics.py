@@ -0,0 +1,263 @@
+"""In-process metrics with Prometheus text and JSON export."""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Type, Union
+
+# Sorted (label, value) pairs identifying one series of a metric.
+Labels = Tuple[Tuple[str, str], ...]
+
+# Upper bounds (seconds) of latency histogram buckets; +Inf is implicit.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "shoex_http_request_seconds": "Latency of HTTP requests per host.",
+    "shoex_http_requests_total": "HTTP requests per host and status.",
+    "shoex_http_response_bytes_total": "Response body bytes downloaded per host.",
+    "shoex_http_wire_bytes_total": "Response body bytes on the wire, before decoding, per host.",
+    "shoex_wire_ratio": "Wire bytes per decoded response byte of each source.",
+    "shoex_http_cache_hits_total": "Requests served from the response cache per host.",
+    "shoex_pages_total": "Catalog pages crawled per source.",
+    "shoex_products_total": "Products parsed per source.",
+    "shoex_duplicate_offers_total": "Repeated offers of a product dropped per source.",
+    "shoex_pages_per_second": "Pages per second of the last crawl per source.",
+    "shoex_products_per_second": "Products per second of the last crawl per source.",
+    "shoex_parse_seconds": "Time spent parsing one page per source.",
+    "shoex_pages_in_flight": "Pages being fetched or parsed ahead per source.",
+    "shoex_result_queue_depth": "Scraper results waiting to be merged.",
+    "shoex_stage_seconds": "Duration of pipeline stages.",
+    "shoex_stream_page_seconds": "Time to match and score one page in streaming mode.",
+    "shoex_deals_total": "Deals published in streaming mode per source.",
+    "shoex_deal_detection_seconds": "Time from the start of streaming to each deal found.",
+    "shoex_shards_total": "Crawl shards completed or failed per source.",
+    "shoex_stockx_coverage": "Share of the reported StockX products found per brand.",
+    "shoex_change_rate": "Share of products changed since the previous daemon crawl per unit.",
+    "shoex_refresh_interval_seconds": "Adaptive daemon refresh interval per source unit.",
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Count a value in the first bucket whose bound it does not exceed."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, observations at or below it) pairs, ending with +Inf."""
+        bounds = [repr(float(b)) for b in self.buckets] + ["+Inf"]
+        total = 0
+        pairs = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and histograms.
+
+    Series are keyed by metric name and keyword labels. Updates only take a
+    lock and touch a dict, so they are cheap enough for every request and
+    page; export renders Prometheus text exposition format or JSON.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Add `value` to a counter."""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge to `value`."""
+        key = self._labels(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        **labels: Any,
+    ) -> None:
+        """Record a value in a histogram."""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observe the wall-clock duration of the block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name: str, **labels: Any) -> float:
+        """Current value of a counter or gauge series (0 if never set)."""
+        key = self._labels(labels)
+        with self._lock:
+            for kind in (self._counters, self._gauges):
+                if key in kind.get(name, {}):
+                    return kind[name][key]
+        return 0.0
+
+    def reset(self) -> None:
+        """Forget every series."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every series as plain data, grouped by metric type and name."""
+
+        def series(values: Dict[Labels, Any], render: Any) -> List[Dict[str, Any]]:
+            return [{"labels": dict(key), **render(v)} for key, v in values.items()]
+
+        with self._lock:
+            return {
+                "counters": {
+                    name: series(values, lambda v: {"value": v})
+                    for name, values in self._counters.items()
+                },
+                "gauges": {
+                    name: series(values, lambda v: {"value": v})
+                    for name, values in self._gauges.items()
+                },
+                "histograms": {
+                    name: series(
+                        values,
+                        lambda h: {
+                            "count": h.count,
+                            "sum": h.sum,
+                            "buckets": dict(h.cumulative()),
+                        },
+                    )
+                    for name, values in self._histograms.items()
+                },
+            }
+
+    def to_json(self) -> str:
+        """Snapshot as a JSON document."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, values in sorted(metrics.items()):
+                    header(name, kind)
+                    for key, value in values.items():
+                        lines.append(f"{name}{_render(key)} {value!r}")
+
+            for name, histograms in sorted(self._histograms.items()):
+                header(name, "histogram")
+                for key, histogram in histograms.items():
+                    for bound, count in histogram.cumulative():
+                        lines.append(
+                            f"{name}_bucket{_render(key + (('le', bound),))} {count}"
+                        )
+                    lines.append(f"{name}_sum{_render(key)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{_render(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """Write the metrics to a file: JSON for `.json`, Prometheus text otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            self.to_json() if path.suffix == ".json" else self.to_prometheus(),
+            encoding="utf-8",
+        )
+        return path
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Expose the metrics over HTTP from a daemon thread.
+        `/metrics` answers in Prometheus text, `/metrics.json` in JSON.
+        """
+        server = ThreadingHTTPServer((host, port), _handler(self))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _render(labels: Labels) -> str:
+    """Prometheus label set, e.g. {host="nike.com",status="200"}."""
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _handler(metrics: Metrics) -> Type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        """Serve the registry's current snapshot."""
+
+        def do_GET(self) -> None:  # noqa: N802 pylint: disable=invalid-name
+            """Render the metrics in the format the path asks for."""
+            if self.path == "/metrics.json":
+                body, content_type = metrics.to_json(), "application/json"
+            elif self.path in ("/", "/metrics"):
+                body, content_type = (
+                    metrics.to_prometheus(),
+                    "text/plain; version=0.0.4",
+                )
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args: Any) -> None:
+            """Scrapes of the endpoint are not worth logging."""
+
+    return Handler
+
+
+# Registry shared by the whole process.
+METRICS = Metrics()
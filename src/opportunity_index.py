@@ -0,0 +1,317 @@
+"""Ranked index of offer opportunities kept up to date price by price."""
+import math
+import random
+import re
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import pandas as pd
+
+from shoes_purchase_analyzer import Analyzer
+from style_matching import MULTI_CODE_SEPARATORS, normalize_style_code
+
+# (source, retailer product id) of an offer.
+OfferKey = Tuple[str, str]
+
+# (source, retailer product id, StockX styleId) of an opportunity.
+PairKey = Tuple[str, str, str]
+
+
+class Opportunity(NamedTuple):
+    """A retailer offer matched to a StockX product, with its profit in PLN."""
+
+    source: str
+    id: str
+    styleId: str
+    price: float
+    link: str
+    Title: str
+    averageDeadstockPrice: float
+    numberOfBids: float
+    volatility: float
+    profitOrLoss: float
+
+
+def liquid(opportunity: Opportunity) -> bool:
+    """The demand and volatility filters of `Analyzer.analyze`."""
+    return opportunity.numberOfBids > 0 and opportunity.volatility < 1
+
+
+class _Node:  # pylint: disable=too-few-public-methods
+    """Skip-list entry with its next node on each of its levels."""
+
+    __slots__ = ("key", "value", "forward")
+
+    def __init__(self, key: Any, value: Any, level: int) -> None:
+        self.key = key
+        self.value = value
+        self.forward: List[Optional["_Node"]] = [None] * level
+
+
+class _SkipList:
+    """Sorted map with expected O(log n) insert and remove and in-order iteration."""
+
+    MAX_LEVEL = 32
+
+    def __init__(self) -> None:
+        self._head = _Node(None, None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._random = random.Random()  # nosec B311
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _predecessors(self, key: Any) -> List[_Node]:
+        """Last node before `key` on every level."""
+        update = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.forward[level] is not None and node.forward[level].key < key:
+                node = node.forward[level]
+            update[level] = node
+        return update
+
+    def insert(self, key: Any, value: Any) -> None:
+        """Add an entry; keys must be unique."""
+        update = self._predecessors(key)
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        self._level = max(self._level, level)
+        node = _Node(key, value, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+        self._size += 1
+
+    def remove(self, key: Any) -> None:
+        """Remove the entry with the given key, if any."""
+        update = self._predecessors(key)
+        node = update[0].forward[0]
+        if node is None or node.key != key:
+            return
+        for i, forward in enumerate(node.forward):
+            update[i].forward[i] = forward
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+
+    def values(self) -> Iterator[Any]:
+        """Values in key order."""
+        node = self._head.forward[0]
+        while node is not None:
+            yield node.value
+            node = node.forward[0]
+
+
+class OpportunityIndex:  # pylint: disable=too-many-instance-attributes
+    """
+    Every (retailer offer, StockX product) pair ranked by score, highest first.
+
+    StockX products and retailer offers are updated one at a time as their
+    prices change; only the pairs involving the changed item are re-scored,
+    each in O(log n) in a skip list, so top-K and threshold queries never
+    re-derive the whole ranking. Offers are matched to products by
+    normalized style code like `StyleIndex` does, and profits are computed
+    with the fees and exchange rate of the analyzer. The score is the
+    profit by default; pass `score` to rank by something else.
+    """
+
+    def __init__(
+        self,
+        analyzer: Analyzer,
+        score: Optional[Callable[[Opportunity], float]] = None,
+    ) -> None:
+        self.analyzer = analyzer
+        self.score = score or (lambda opportunity: opportunity.profitOrLoss)
+        self._products: Dict[str, Dict[str, Any]] = {}
+        self._product_codes: Dict[str, Set[str]] = {}
+        self._products_by_code: Dict[str, Set[str]] = {}
+        self._offers: Dict[OfferKey, Tuple[float, str]] = {}
+        self._offers_by_code: Dict[str, Set[OfferKey]] = {}
+        self._entries: Dict[PairKey, Tuple[float, PairKey]] = {}
+        self._ranking = _SkipList()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def update_product(self, style_id: str, market: Mapping[str, Any]) -> None:
+        """Add or reprice a StockX product (`Title` and its market fields, in USD)."""
+        style_id = str(style_id)
+        codes = {
+            normalize_style_code(code)
+            for code in re.split(MULTI_CODE_SEPARATORS, style_id)
+        } - {""}
+        with self._lock:
+            for code in self._product_codes.get(style_id, set()) - codes:
+                self._products_by_code[code].discard(style_id)
+                for offer in self._offers_by_code.get(code, ()):
+                    self._unrank((*offer, style_id))
+            self._products[style_id] = dict(market)
+            self._product_codes[style_id] = codes
+            for code in codes:
+                self._products_by_code.setdefault(code, set()).add(style_id)
+                for offer in self._offers_by_code.get(code, ()):
+                    self._rank(offer, style_id)
+
+    def remove_product(self, style_id: str) -> None:
+        """Drop a StockX product and its opportunities."""
+        style_id = str(style_id)
+        with self._lock:
+            for code in self._product_codes.pop(style_id, set()):
+                self._products_by_code[code].discard(style_id)
+                for offer in self._offers_by_code.get(code, ()):
+                    self._unrank((*offer, style_id))
+            self._products.pop(style_id, None)
+
+    def update_offer(
+        self, source: str, product_id: str, price: float, link: str
+    ) -> None:
+        """Add or reprice a retailer offer (price in PLN)."""
+        offer = (source, str(product_id))
+        code = normalize_style_code(product_id)
+        terms = (float(price), link)
+        with self._lock:
+            if self._offers.get(offer) == terms:
+                # Same price and link: every pair of the offer keeps its score.
+                return
+            self._offers[offer] = terms
+            self._offers_by_code.setdefault(code, set()).add(offer)
+            for style_id in self._products_by_code.get(code, ()):
+                self._rank(offer, style_id)
+
+    def remove_offer(self, source: str, product_id: str) -> None:
+        """Drop a retailer offer and its opportunities."""
+        offer = (source, str(product_id))
+        code = normalize_style_code(product_id)
+        with self._lock:
+            if self._offers.pop(offer, None) is None:
+                return
+            self._offers_by_code[code].discard(offer)
+            for style_id in self._products_by_code.get(code, ()):
+                self._unrank((*offer, style_id))
+
+    def update_products(self, df: pd.DataFrame) -> None:
+        """`update_product` for every row of a StockX frame with a `styleId`."""
+        for record in df[df["styleId"].notna()].to_dict("records"):
+            self.update_product(record.pop("styleId"), record)
+
+    def update_offers(self, source: str, df: pd.DataFrame) -> None:
+        """`update_offer` for every row of a retailer frame with an `id`."""
+        df = df[df["id"].notna()]
+        for product_id, price, link in zip(df["id"], df["price"], df["link"]):
+            self.update_offer(source, product_id, price, link)
+
+    def set_analyzer(self, analyzer: Analyzer) -> None:
+        """
+        Score with another analyzer, e.g. at a new exchange rate.
+        Everything is re-ranked only if its rate or fees differ.
+        """
+        with self._lock:
+            previous, self.analyzer = self.analyzer, analyzer
+            if _terms(previous) == _terms(analyzer):
+                return
+            for source, product_id, style_id in list(self._entries):
+                self._rank((source, product_id), style_id)
+
+    def top(
+        self, k: int, predicate: Optional[Callable[[Opportunity], bool]] = None
+    ) -> List[Opportunity]:
+        """The `k` best opportunities passing `predicate`."""
+        result: List[Opportunity] = []
+        if k <= 0:
+            return result
+        with self._lock:
+            for opportunity in self._ranking.values():
+                if predicate is None or predicate(opportunity):
+                    result.append(opportunity)
+                    if len(result) == k:
+                        break
+        return result
+
+    def above(
+        self,
+        min_score: float,
+        predicate: Optional[Callable[[Opportunity], bool]] = None,
+    ) -> List[Opportunity]:
+        """Every opportunity scoring more than `min_score` and passing `predicate`, best first."""
+        result: List[Opportunity] = []
+        with self._lock:
+            for opportunity in self._ranking.values():
+                if self.score(opportunity) <= min_score:
+                    break
+                if predicate is None or predicate(opportunity):
+                    result.append(opportunity)
+        return result
+
+    @staticmethod
+    def to_frame(opportunities: List[Opportunity]) -> pd.DataFrame:
+        """Opportunities as a DataFrame with the analysis column names."""
+        return pd.DataFrame(opportunities, columns=Opportunity._fields)
+
+    def _rank(self, offer: OfferKey, style_id: str) -> None:
+        """(Re)insert the opportunity of an offer and a product at its current score."""
+        pair = (*offer, style_id)
+        self._unrank(pair)
+        price, link = self._offers[offer]
+        product = self._products[style_id]
+        average = _number(product.get("averageDeadstockPrice"))
+        # NaN keys never compare equal, so they could not be removed again.
+        if not (math.isfinite(average) and math.isfinite(price)):
+            return
+        average_pln = round(average * self.analyzer.usd_to_pln, 2)
+        title = product.get("Title")
+        opportunity = Opportunity(
+            source=offer[0],
+            id=offer[1],
+            styleId=style_id,
+            price=price,
+            link=link,
+            Title="" if title is None else str(title),
+            averageDeadstockPrice=average_pln,
+            numberOfBids=_number(product.get("numberOfBids")),
+            volatility=_number(product.get("volatility")),
+            profitOrLoss=float(self.analyzer.payout(average_pln)) - price,
+        )
+        score = self.score(opportunity)
+        if not math.isfinite(score):
+            return
+        sort_key = (-score, pair)
+        self._entries[pair] = sort_key
+        self._ranking.insert(sort_key, opportunity)
+
+    def _unrank(self, pair: PairKey) -> None:
+        sort_key = self._entries.pop(pair, None)
+        if sort_key is not None:
+            self._ranking.remove(sort_key)
+
+
+def _terms(analyzer: Analyzer) -> Tuple[float, ...]:
+    """Everything an analyzer's profits depend on."""
+    return (
+        analyzer.usd_to_pln,
+        analyzer.transaction_fee,
+        analyzer.payment_proc,
+        analyzer.delivery_cost_usd,
+    )
+
+
+def _number(value: Any) -> float:
+    """Market field as a float; missing values become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
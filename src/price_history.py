@@ -0,0 +1,168 @@
+"""Append-only history of every price observed per source and product."""
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from logger_module import get_logger
+
+
+class PriceHistory:
+    """
+    SQLite time series of (source, id, observed_at, price) observations.
+
+    Rows are only ever appended. Each one also stores its relative `change`
+    from the product's previous observation, so trend and volatility queries
+    are plain aggregates over the primary key, which clusters every product's
+    observations in time order, instead of window functions over months of
+    runs or a reload into pandas.
+    """
+
+    def __init__(self, path: str = "price_history.sqlite") -> None:
+        """Open (or create) the history at the given path."""
+        self.logging = get_logger(self.__class__.__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS observations (
+                    source TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    observed_at REAL NOT NULL,
+                    price REAL NOT NULL,
+                    change REAL,
+                    PRIMARY KEY (source, id, observed_at)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def record(  # pylint: disable=too-many-arguments
+        self,
+        source: str,
+        df: pd.DataFrame,
+        id_column: str = "id",
+        price_column: str = "price",
+        observed_at: Optional[float] = None,
+    ) -> int:
+        """Append one observation per priced product of a crawl; return how many."""
+        observed_at = observed_at or time.time()
+        df = df[[id_column, price_column]].dropna()
+        rows = [
+            {
+                "source": source,
+                "id": str(product_id),
+                "at": observed_at,
+                "price": round(float(price), 2),
+            }
+            for product_id, price in zip(df[id_column], df[price_column])
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO observations
+                SELECT :source, :id, :at, :price, :price / (
+                    SELECT price FROM observations
+                    WHERE source = :source AND id = :id AND observed_at < :at
+                    ORDER BY observed_at DESC
+                    LIMIT 1
+                ) - 1
+                """,
+                rows,
+            )
+        self.logging.info(f"{source}: recorded {len(rows)} price observations.")
+        return len(rows)
+
+    def observations(self, source: str, product_id: str) -> pd.DataFrame:
+        """Full price history of one product, oldest first."""
+        with self._lock:
+            df = pd.read_sql_query(
+                """
+                SELECT observed_at, price FROM observations
+                WHERE source = ? AND id = ?
+                ORDER BY observed_at
+                """,
+                self._conn,
+                params=(source, str(product_id)),
+            )
+        df["observed_at"] = pd.to_datetime(df["observed_at"], unit="s")
+        return df
+
+    def signals(
+        self, source: str, days: float = 30, until: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Trend signals of every product over the `days` before `until` (now).
+
+        Columns: `observations`, `first_price`, `last_price`, `change` and
+        `change_pct` between them, `min_price`, and `volatility`, the standard
+        deviation of relative changes between consecutive observations.
+        """
+        end = (until or datetime.now()).timestamp()
+        start = end - timedelta(days=days).total_seconds()
+        with self._lock:
+            df = pd.read_sql_query(
+                """
+                WITH recent AS (
+                    SELECT
+                        id,
+                        COUNT(*) AS observations,
+                        MIN(price) AS min_price,
+                        AVG(change) AS mean_change,
+                        AVG(change * change) AS mean_square_change,
+                        MIN(observed_at) AS first_at,
+                        MAX(observed_at) AS last_at
+                    FROM observations
+                    WHERE source = :source AND observed_at > :start AND observed_at <= :end
+                    GROUP BY id
+                )
+                SELECT
+                    recent.id,
+                    observations,
+                    first.price AS first_price,
+                    last.price AS last_price,
+                    min_price,
+                    mean_change,
+                    mean_square_change
+                FROM recent
+                JOIN observations AS first
+                    ON first.source = :source
+                    AND first.id = recent.id
+                    AND first.observed_at = recent.first_at
+                JOIN observations AS last
+                    ON last.source = :source
+                    AND last.id = recent.id
+                    AND last.observed_at = recent.last_at
+                """,
+                self._conn,
+                params={"source": source, "start": start, "end": end},
+            )
+
+        df["change"] = df["last_price"] - df["first_price"]
+        df["change_pct"] = df["change"] / df["first_price"]
+        # Both are NULL, so object columns, while no product has two observations.
+        variance = (
+            df.pop("mean_square_change").astype("float64")
+            - df.pop("mean_change").astype("float64") ** 2
+        )
+        df["volatility"] = np.sqrt(variance.clip(lower=0))
+        return df
+
+    def min_since(self, source: str, since: datetime) -> pd.DataFrame:
+        """Lowest price of every product observed since the given time."""
+        with self._lock:
+            return pd.read_sql_query(
+                """
+                SELECT id, MIN(price) AS min_price FROM observations
+                WHERE source = ? AND observed_at >= ?
+                GROUP BY id
+                """,
+                self._conn,
+                params=(source, since.timestamp()),
+            )
@@ -0,0 +1,116 @@
+"""Persistent store of the latest scraped offer per retailer product."""
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+from logger_module import get_logger
+
+
+class ProductStore:
+    """SQLite-backed product store keyed by scraper name and product id."""
+
+    def __init__(self, path: str = "product_store.sqlite") -> None:
+        """Open (or create) the store at the given path."""
+        self.logging = get_logger(self.__class__.__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    source TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    price REAL,
+                    link TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (source, id)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS crawls (
+                    source TEXT PRIMARY KEY,
+                    completed REAL NOT NULL
+                )
+                """
+            )
+
+    def prices(self, source: str) -> Dict[str, float]:
+        """Return the last known price of every product of a source."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, price FROM products WHERE source = ?", (source,)
+            ).fetchall()
+        return dict(rows)
+
+    def update(self, source: str, df: pd.DataFrame, complete: bool) -> pd.DataFrame:
+        """
+        Record a crawl and return the delta: new products and price changes.
+
+        When the crawl covered the whole catalog (`complete`), products that
+        were not seen in it are dropped from the store as delisted, and the
+        crawl's time is kept as the source's last complete one.
+        """
+        now = time.time()
+        df = df.drop_duplicates(subset=["id"], keep="last")
+        known = self.prices(source)
+
+        is_new_or_changed = [
+            known.get(str(product_id)) != price
+            for product_id, price in zip(df["id"], df["price"])
+        ]
+        delta = df[is_new_or_changed]
+
+        rows = [
+            (source, str(product_id), price, link, now, now)
+            for product_id, price, link in zip(df["id"], df["price"], df["link"])
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO products (source, id, price, link, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, id) DO UPDATE SET
+                    price = excluded.price,
+                    link = excluded.link,
+                    last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+            if complete:
+                self._conn.execute(
+                    "DELETE FROM products WHERE source = ? AND last_seen < ?",
+                    (source, now),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO crawls (source, completed) VALUES (?, ?)",
+                    (source, now),
+                )
+
+        self.logging.info(
+            f"{source}: {len(delta)} new or changed out of {len(df)} crawled."
+        )
+        return delta
+
+    def last_complete(self, source: str) -> Optional[float]:
+        """Epoch time of the last crawl of a source that covered its whole catalog."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed FROM crawls WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def snapshot(self, source: str) -> pd.DataFrame:
+        """Return the current merged catalog of a source."""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT id, price, link FROM products WHERE source = ?",
+                self._conn,
+                params=(source,),
+            )
@@ -0,0 +1,141 @@
+"""Storage backends for scraped and analyzed results."""
+import abc
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from logger_module import get_logger
+
+# Run ids are the local time a run started at.
+RUN_ID_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class ResultSink(abc.ABC):
+    """
+    Store DataFrames partitioned by result name and run timestamp.
+
+    Every result lands in ``<root>/<name>/run=<run_id>/<name>.<suffix>``, so
+    one sink instance groups everything written during a single run and older
+    runs stay available for reloading.
+    """
+
+    suffix: str = ""
+
+    def __init__(
+        self, root: Union[str, Path] = "results", run_id: Optional[str] = None
+    ) -> None:
+        self.logging = get_logger(self.__class__.__name__)
+        self.root = Path(root)
+        self.run_id = run_id or datetime.now().strftime(RUN_ID_FORMAT)
+
+    @abc.abstractmethod
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        """Write a DataFrame to the given file."""
+
+    @abc.abstractmethod
+    def read(self, path: Path) -> pd.DataFrame:
+        """Read a DataFrame back from the given file."""
+
+    def path(self, name: str, run_id: Optional[str] = None) -> Path:
+        """File holding a result of the given (or the current) run."""
+        return (
+            self.root / name / f"run={run_id or self.run_id}" / f"{name}.{self.suffix}"
+        )
+
+    def save(self, df: pd.DataFrame, name: str) -> Path:
+        """Save a result of the current run."""
+        path = self.path(name)
+        os.makedirs(path.parent, exist_ok=True)
+        self.logging.info(f"Saving {name} to {path}")
+        self.write(df, path)
+        return path
+
+    def runs(self, name: str) -> List[str]:
+        """Ids of all stored runs of a result, oldest first."""
+        return sorted(
+            path.parent.name.split("=", 1)[1]
+            for path in self.root.glob(f"{name}/run=*/{name}.{self.suffix}")
+        )
+
+    def latest_run(self, name: str) -> str:
+        """Id of the latest stored run of a result."""
+        runs = self.runs(name)
+        if not runs:
+            raise FileNotFoundError(f"No stored runs of {name} in {self.root}")
+        return runs[-1]
+
+    @staticmethod
+    def run_time(run_id: str) -> datetime:
+        """When a run started, as encoded in its id."""
+        return datetime.strptime(run_id, RUN_ID_FORMAT)
+
+    def load(self, name: str, run_id: Optional[str] = None) -> pd.DataFrame:
+        """Load a result of the given run, the latest one by default."""
+        return self.read(self.path(name, run_id or self.latest_run(name)))
+
+
+class ParquetSink(ResultSink):
+    """Lossless, compressed columnar storage; the default sink."""
+
+    suffix = "parquet"
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        df.to_parquet(path, index=False, compression="zstd")
+
+    def read(self, path: Path) -> pd.DataFrame:
+        return pd.read_parquet(path)
+
+
+class FeatherSink(ResultSink):
+    """Arrow IPC files: fastest to reload, larger on disk."""
+
+    suffix = "feather"
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        df.reset_index(drop=True).to_feather(path)
+
+    def read(self, path: Path) -> pd.DataFrame:
+        return pd.read_feather(path)
+
+
+class ExcelSink(ResultSink):
+    """
+    Excel workbooks for human-facing reports.
+
+    Written with xlsxwriter in constant-memory mode, which streams rows to
+    disk instead of holding the whole sheet in memory. That mode only keeps
+    cells written row by row, in order, so rows are written one at a time
+    rather than through `DataFrame.to_excel`, which goes column by column.
+    """
+
+    suffix = "xlsx"
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        import xlsxwriter  # pylint: disable=import-outside-toplevel
+
+        options = {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            "remove_timezone": True,
+        }
+        with xlsxwriter.Workbook(str(path), options) as workbook:
+            sheet = workbook.add_worksheet()
+            sheet.write_row(0, 0, [str(column) for column in df.columns])
+            for row, values in enumerate(df.itertuples(index=False, name=None), 1):
+                sheet.write_row(row, 0, [self.cell(value) for value in values])
+
+    @staticmethod
+    def cell(value: Any) -> Any:
+        """A DataFrame value as xlsxwriter writes it; missing values stay blank."""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def read(self, path: Path) -> pd.DataFrame:
+        return pd.read_excel(path)
@@ -1 +1,4 @@
 """Init in scrapers."""
+from ._registry import SCRAPERS, available, create, load, register
+
+__all__ = ["SCRAPERS", "available", "create", "load", "register"]
@@ -1,22 +1,93 @@
 """BaseScraper module for common scraper functionalities."""
 
 import abc
+import asyncio
 import logging
-import os
-from pathlib import Path
-from typing import Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing
+from functools import partial
+from queue import Queue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import urlsplit
 
 import pandas as pd
 import requests
+from requests.structures import CaseInsensitiveDict
 
+from metrics import METRICS
+from price_history import PriceHistory
+from product_store import ProductStore
+from result_sink import ParquetSink, ResultSink
 
-class BaseScraper(abc.ABC):
+from ._columns import ColumnAccumulator, Columns, OfferAccumulator, chunk_size
+from ._extract import ExtractSpec, loads, parse_page
+from ._http_cache import ResponseCache
+from ._schema import RETAILER_SCHEMA
+from ._throttle import (
+    CircuitBreaker,
+    CircuitOpenError,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
+from ._transport import (
+    ACCEPT_ENCODING,
+    content_length,
+    make_session,
+    set_wire_size,
+    wire_size,
+)
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+class BaseScraper(abc.ABC):  # pylint: disable=too-many-instance-attributes
     """Abstract class for web scraping."""
 
+    # Where scraped results are saved, shared so a run lands in one partition.
+    sink: Optional[ResultSink] = None
+
+    # Optional on-disk response cache shared by every scraper.
+    cache: Optional[ResponseCache] = None
+
+    # Optional log of every price observed, shared by every scraper.
+    history: Optional[PriceHistory] = None
+
+    # Whether sessions multiplex HTTPS requests over HTTP/2 (needs httpx[http2]).
+    http2: bool = False
+
+    # Columns identifying a product and its price in the scraper's rows.
+    ID_COLUMN = "id"
+    PRICE_COLUMN = "price"
+
+    # Concurrency slots, rate limiters and circuit breakers shared by every
+    # scraper talking to the same host.
+    _host_slots: Dict[str, threading.BoundedSemaphore] = {}
+    _host_buckets: Dict[str, TokenBucket] = {}
+    _host_breakers: Dict[str, CircuitBreaker] = {}
+    _host_lock = threading.Lock()
+
     def __init__(self) -> None:
         self.headers = {
             "accept": "application/json",
-            "accept-encoding": "utf-8",
+            "accept-encoding": ACCEPT_ENCODING,
             "accept-language": "en-GB,en;q=0.9",
             "sec-fetch-dest": "empty",
             "sec-fetch-mode": "cors",
@@ -27,43 +98,781 @@ class BaseScraper(abc.ABC):
             "app-version": "2022.05.08.04",
         }
         self.url: str = ""
-        self._session = requests.session()
+        self.max_in_flight: int = 4
+        self.cache_ttl: float = 60 * 60
+        self.timeout: float = 10
+        self.requests_per_second: float = 5.0
+        self.max_retries: int = 4
+        self.backoff_base: float = 0.5
+        self.backoff_cap: float = 30.0
+        self.logging = logging.getLogger(self.__class__.__name__)
+        # Bytes received on the wire and after content decoding.
+        self.wire_bytes: int = 0
+        self.decoded_bytes: int = 0
+        self._bytes_lock = threading.Lock()
+        self._http: Optional[requests.Session] = None
+
+    @property
+    def _session(self) -> requests.Session:
+        """HTTP session, created on first use with a pool of `max_in_flight` connections."""
+        if self._http is None:
+            self._http = make_session(self.max_in_flight, self.http2)
+        return self._http
 
     @abc.abstractmethod
-    def run(self) -> Any:
+    def run(self, queue: Optional[Queue] = None) -> Any:
         """Abstract method for running the scraper."""
         pass
 
+    async def arun(
+        self, session: "aiohttp.ClientSession", queue: Optional[Queue] = None
+    ) -> None:
+        """
+        Run a blocking scraper in a worker thread of the event loop.
+        The shared aiohttp `session` is unused; the scraper keeps its own.
+        """
+        del session
+        await asyncio.to_thread(self.run, queue)
+
+    @property
+    def crawl_units(self) -> Tuple[str, ...]:
+        """Slices of the source (groups, brands...) that can be crawled on their own."""
+        return ()
+
+    def crawl(self, units: Sequence[str]) -> pd.DataFrame:
+        """
+        Crawl the given units from scratch and return their rows, without
+        saving or publishing them.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} cannot crawl units.")
+
+    def configure(
+        self,
+        brands: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Narrow the crawl to some brands and categories.
+        Sources that cannot filter on one of them warn and crawl everything.
+        """
+        name = self.__class__.__name__
+        if brands:
+            self.logging.warning(f"{name} cannot select brands, crawling all of them.")
+        if categories:
+            self.logging.warning(
+                f"{name} cannot select categories, crawling all of them."
+            )
+
+    @classmethod
+    def save_file(cls, df: pd.DataFrame, file_name: str) -> None:
+        """Saving files through the shared result sink (Parquet by default)."""
+        if BaseScraper.sink is None:
+            BaseScraper.sink = ParquetSink()
+        BaseScraper.sink.save(df, file_name)
+
+    @property
+    def host(self) -> str:
+        """Network location the scraper sends its requests to."""
+        return urlsplit(self.url).netloc
+
+    def _per_host(self, registry: Dict[str, Any], factory: Callable[[], Any]) -> Any:
+        """Return the registry entry of the scraper's host, creating it once."""
+        host = self.host
+        with self._host_lock:
+            if host not in registry:
+                registry[host] = factory()
+            return registry[host]
+
+    def _host_slot(self) -> threading.BoundedSemaphore:
+        """Return the in-flight request semaphore for the scraper's host."""
+        return self._per_host(
+            self._host_slots, lambda: threading.BoundedSemaphore(self.max_in_flight)
+        )
+
+    def _bucket(self) -> TokenBucket:
+        """Return the rate limiter for the scraper's host."""
+        return self._per_host(
+            self._host_buckets, lambda: TokenBucket(self.requests_per_second)
+        )
+
+    def _breaker(self) -> CircuitBreaker:
+        """Return the circuit breaker for the scraper's host."""
+        return self._per_host(self._host_breakers, CircuitBreaker)
+
+    def _check_breaker(self) -> None:
+        """Refuse to send requests to a host whose circuit is open."""
+        if self._breaker().is_open:
+            raise CircuitOpenError(f"Too many failures from {self.host}")
+
     @staticmethod
-    def save_file(df: pd.DataFrame, file_name: str) -> None:
-        """Saving files."""
-        xlsx_results_path = Path("xlsx_results")
+    def _retryable(status: int) -> bool:
+        """Throttling and server errors are worth retrying."""
+        return status == 429 or status >= 500
+
+    def _record_success(self) -> None:
+        self._breaker().record_success()
+        self._bucket().speed_up()
 
-        if os.path.exists(xlsx_results_path) is False:
-            os.makedirs(xlsx_results_path)
+    def _record_failure(
+        self, attempt: int, retry_after: Optional[float]
+    ) -> Optional[float]:
+        """
+        Slow the host down after a failed attempt.
+        Return the delay before the next attempt, or None to give up.
+        """
+        breaker = self._breaker()
+        breaker.record_failure()
+        self._bucket().slow_down(retry_after)
+        if attempt >= self.max_retries or breaker.is_open:
+            return None
+        return backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
 
-        logging.info(f"Saving file: {file_name}")
+    def _observe_request(
+        self, started: float, status: str, size: int = 0, wire: int = 0
+    ) -> None:
+        """
+        Record the latency, outcome and body size of one request to the host:
+        `size` decoded bytes that took `wire` bytes on the wire.
+        """
+        host = self.host
+        METRICS.observe(
+            "shoex_http_request_seconds", time.perf_counter() - started, host=host
+        )
+        METRICS.inc("shoex_http_requests_total", host=host, status=status)
+        if size:
+            METRICS.inc("shoex_http_response_bytes_total", size, host=host)
+            METRICS.inc("shoex_http_wire_bytes_total", wire, host=host)
+            with self._bytes_lock:
+                self.decoded_bytes += size
+                self.wire_bytes += wire
 
-        saving_path = Path(xlsx_results_path / f"{file_name}.xlsx")
-        df.to_excel(saving_path, index=False)
+    def _report_transfer(self) -> None:
+        """Publish how much the responses received so far were compressed on the wire."""
+        if not self.decoded_bytes:
+            return
+        ratio = self.wire_bytes / self.decoded_bytes
+        METRICS.set("shoex_wire_ratio", ratio, source=self.__class__.__name__)
+        self.logging.info(
+            f"Received {self.wire_bytes / 1e6:.2f} MB on the wire for "
+            f"{self.decoded_bytes / 1e6:.2f} MB of responses ({ratio:.0%})."
+        )
 
     def _get(self, params: dict) -> requests.Response:
-        """Perform GET request and handle exceptions."""
+        """
+        Perform GET request and handle exceptions.
+
+        Requests are paced by the host's token bucket. Connection errors,
+        timeouts, 429 and 5xx responses are retried with jittered exponential
+        backoff honoring Retry-After, until `max_retries` or until the host's
+        circuit breaker opens.
+        """
+        key, entry, cached = self._cache_lookup(params)
+        if cached is not None:
+            return cached
+
+        headers = {**self.headers, **self._validators(entry)}
+        attempt = 0
+        while True:
+            self._check_breaker()
+            self._bucket().acquire()
+            started = time.perf_counter()
+            try:
+                with self._host_slot():
+                    r = self._session.get(
+                        self.url, params=params, headers=headers, timeout=self.timeout
+                    )
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as err:
+                self._observe_request(started, "error")
+                logging.error("Request failed (attempt %d): %s", attempt + 1, err)
+                delay = self._record_failure(attempt, None)
+                if delay is None:
+                    raise
+            else:
+                self._observe_request(
+                    started, str(r.status_code), len(r.content), wire_size(r)
+                )
+                if not self._retryable(r.status_code):
+                    break
+                logging.error(
+                    "HTTP %d (attempt %d): %s", r.status_code, attempt + 1, r.url
+                )
+                delay = self._record_failure(
+                    attempt, parse_retry_after(r.headers.get("Retry-After"))
+                )
+                if delay is None:
+                    break
+            time.sleep(delay)
+            attempt += 1
+
+        if not self._retryable(r.status_code):
+            self._record_success()
+        r = self._cache_update(key, entry, r)
         try:
-            r = self._session.get(
-                self.url, params=params, headers=self.headers, timeout=10
-            )
             r.raise_for_status()
+        except requests.exceptions.HTTPError as errh:
+            logging.error("HTTP Error: %s", errh)
+            raise
+        return r
+
+    def _cache_lookup(
+        self, params: dict
+    ) -> Tuple[Optional[str], Optional[dict], Optional[requests.Response]]:
+        """
+        Look a request up in the response cache.
+        Return its key, the stored entry and a response if the entry is fresh.
+        """
+        if self.cache is None:
+            return None, None, None
+
+        key = self.cache.key(self.url, params)
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry, self.cache_ttl):
+            response = self._cached_response(key, entry)
+            if response is not None:
+                METRICS.inc("shoex_http_cache_hits_total", host=self.host)
+                return key, entry, response
+        return key, entry, None
+
+    def _validators(self, entry: Optional[dict]) -> Dict[str, str]:
+        """Conditional request headers for a stale cache entry."""
+        if self.cache is None or entry is None:
+            return {}
+        return self.cache.validators(entry)
+
+    def _cache_update(
+        self, key: Optional[str], entry: Optional[dict], r: requests.Response
+    ) -> requests.Response:
+        """Store a successful response, or serve the cached body on 304."""
+        if self.cache is None or key is None:
             return r
+
+        if r.status_code == 304 and entry is not None:
+            cached = self._cached_response(key, self.cache.refresh(key, entry))
+            if cached is not None:
+                return cached
+        elif r.status_code == 200:
+            self.cache.put(key, r.url, r.status_code, dict(r.headers), r.content)
+        return r
+
+    def _cached_response(self, key: str, entry: dict) -> Optional[requests.Response]:
+        """Rebuild a response from the cache, or None if it was just evicted."""
+        try:
+            content = self.cache.read_body(key)
+        except OSError:
+            return None
+        return self.build_response(
+            entry["url"], entry["status"], entry["headers"], content
+        )
+
+    def decode(self, response: requests.Response) -> Any:
+        """Decode a JSON response body with the fastest available backend."""
+        return loads(response.content)
+
+    @staticmethod
+    def build_response(
+        url: str, status: int, headers: Dict[str, str], content: bytes
+    ) -> requests.Response:
+        """Wrap raw response data so parsers can treat it like `requests` output."""
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content  # pylint: disable=protected-access
+        return response
+
+    @staticmethod
+    def _query_items(params: dict) -> List[Tuple[str, str]]:
+        """Flatten params into (key, value) pairs, expanding list values."""
+        items: List[Tuple[str, str]] = []
+        for key, value in params.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            items.extend((key, str(v)) for v in values)
+        return items
+
+    async def _aget(
+        self, session: "aiohttp.ClientSession", params: dict
+    ) -> requests.Response:
+        """Perform GET request on the event loop with the same retry policy as `_get`."""
+        key, entry, cached = self._cache_lookup(params)
+        if cached is not None:
+            return cached
+
+        headers = {**self.headers, **self._validators(entry)}
+        attempt = 0
+        while True:
+            self._check_breaker()
+            await asyncio.sleep(self._bucket().reserve())
+            started = time.perf_counter()
+            try:
+                response = await self._aget_once(session, params, headers)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as err:
+                self._observe_request(started, "error")
+                logging.error("Request failed (attempt %d): %s", attempt + 1, err)
+                delay = self._record_failure(attempt, None)
+                if delay is None:
+                    raise
+            else:
+                self._observe_request(
+                    started,
+                    str(response.status_code),
+                    len(response.content),
+                    wire_size(response),
+                )
+                if not self._retryable(response.status_code):
+                    break
+                logging.error(
+                    "HTTP %d (attempt %d): %s",
+                    response.status_code,
+                    attempt + 1,
+                    response.url,
+                )
+                delay = self._record_failure(
+                    attempt, parse_retry_after(response.headers.get("Retry-After"))
+                )
+                if delay is None:
+                    break
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if not self._retryable(response.status_code):
+            self._record_success()
+        response = self._cache_update(key, entry, response)
+        try:
+            response.raise_for_status()
         except requests.exceptions.HTTPError as errh:
             logging.error("HTTP Error: %s", errh)
-            raise requests.exceptions.HTTPError
-        except requests.exceptions.ConnectionError as errc:
-            logging.error("Error Connecting: %s", errc)
-            raise requests.exceptions.ConnectionError
-        except requests.exceptions.Timeout as errt:
-            logging.error("Timeout Error: %s", errt)
-            raise requests.exceptions.Timeout
-        except requests.exceptions.RequestException as err:
-            logging.error("Unknown Error: %s", err)
-            raise requests.exceptions.RequestException
+            raise
+        return response
+
+    async def _aget_once(
+        self, session: "aiohttp.ClientSession", params: dict, headers: dict
+    ) -> requests.Response:
+        """Single aiohttp request, with its errors mapped onto `requests` ones."""
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        try:
+            async with session.get(
+                self.url,
+                params=self._query_items(params),
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as r:
+                content = await r.read()
+                response = self.build_response(
+                    str(r.url), r.status, dict(r.headers), content
+                )
+                # Raw byte counts need aiohttp 3.13; older ones only have the header.
+                set_wire_size(
+                    response,
+                    getattr(
+                        r.content,
+                        "total_raw_bytes",
+                        content_length(r.headers, len(content)),
+                    ),
+                )
+                return response
+        except asyncio.TimeoutError as errt:
+            raise requests.exceptions.Timeout(str(errt)) from errt
+        except aiohttp.ClientConnectionError as errc:
+            raise requests.exceptions.ConnectionError(str(errc)) from errc
+        except aiohttp.ClientError as err:
+            raise requests.exceptions.RequestException(str(err)) from err
+
+    def paginate(
+        self,
+        page_params: Callable[[int], dict],
+        parse: Callable[[requests.Response], Optional[Columns]],
+        limit: Optional[int] = None,
+    ) -> Iterator[Columns]:
+        """
+        Fetch consecutive pages concurrently and yield them parsed, in order.
+
+        Up to ``max_in_flight`` pages are fetched and parsed ahead of the page
+        being yielded; parsing happens on the fetching thread. Iteration ends
+        at the first page without products (`parse` returns None) or after
+        `limit` pages; pending requests are cancelled when it ends or when the
+        caller stops early.
+        """
+        pending: Deque[Future] = deque()
+        next_page = 0
+        source = self.__class__.__name__
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            try:
+                while True:
+                    while len(pending) < self.max_in_flight and (
+                        limit is None or next_page < limit
+                    ):
+                        pending.append(
+                            executor.submit(
+                                lambda params: parse(self._get(params)),
+                                page_params(next_page),
+                            )
+                        )
+                        next_page += 1
+                    METRICS.set("shoex_pages_in_flight", len(pending), source=source)
+                    if not pending:
+                        return
+
+                    chunk = pending.popleft().result()
+                    if chunk is None:
+                        return
+                    yield chunk
+            finally:
+                for future in pending:
+                    future.cancel()
+                METRICS.set("shoex_pages_in_flight", 0, source=source)
+
+    async def apaginate(
+        self,
+        session: "aiohttp.ClientSession",
+        page_params: Callable[[int], dict],
+        parse: Callable[[requests.Response], Awaitable[Optional[Columns]]],
+        limit: Optional[int] = None,
+    ) -> AsyncGenerator[Columns, None]:
+        """Asyncio counterpart of `paginate` sharing the caller's session."""
+
+        async def fetch_and_parse(params: dict) -> Optional[Columns]:
+            return await parse(await self._aget(session, params))
+
+        pending: Deque[asyncio.Task] = deque()
+        next_page = 0
+        source = self.__class__.__name__
+
+        try:
+            while True:
+                while len(pending) < self.max_in_flight and (
+                    limit is None or next_page < limit
+                ):
+                    pending.append(
+                        asyncio.ensure_future(fetch_and_parse(page_params(next_page)))
+                    )
+                    next_page += 1
+                METRICS.set("shoex_pages_in_flight", len(pending), source=source)
+                if not pending:
+                    return
+
+                chunk = await pending.popleft()
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            for task in pending:
+                task.cancel()
+            METRICS.set("shoex_pages_in_flight", 0, source=source)
+
+
+class PaginatedScraper(BaseScraper):  # pylint: disable=too-many-instance-attributes
+    """Base class for retailers exposing a paginated catalog API."""
+
+    # Product store enabling incremental crawls, shared by every retailer.
+    store: Optional[ProductStore] = None
+
+    # Seconds after which an incremental crawl runs in full again, so that
+    # repricing deep in a catalog is not missed forever.
+    full_crawl_interval: float = 24 * 60 * 60
+
+    # Worker processes decoding pages off the GIL; None parses in-thread.
+    parse_pool: Optional[ProcessPoolExecutor] = None
+
+    # Category names accepted by `configure`, mapped to catalog groups.
+    CATEGORIES: Dict[str, str] = {}
+
+    # Also save every listed offer, duplicates included, as `<Name>_offers`.
+    all_offers: bool = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows = OfferAccumulator(
+            RETAILER_SCHEMA, RETAILER_SCHEMA, all_offers=self.all_offers
+        )
+        self.spec: ExtractSpec
+        self.delta: pd.DataFrame = pd.DataFrame()
+        # Whether the catalog API lists the newest products first, which lets
+        # incremental crawls stop once they reach already known offers.
+        self.newest_first: bool = False
+        self.unchanged_pages: int = 2
+        self._stops_early: bool = False
+        # Set when a crawl ended early on errors; its results are partial.
+        self.partial: bool = False
+        self.pages_crawled: int = 0
+        self._crawl_started: float = 0.0
+        # Called with the scraper name and every parsed page, e.g. to score
+        # offers while the crawl is still running.
+        self.on_page: Optional[Callable[[str, Columns], None]] = None
+        self.selected_groups: Optional[Tuple[str, ...]] = None
+
+    @property
+    @abc.abstractmethod
+    def groups(self) -> Tuple[str, ...]:
+        """Catalog groups (queries, categories...) crawled one after another."""
+
+    @abc.abstractmethod
+    def page_params(self, group: str, page: int) -> dict:
+        """Build request parameters for the given zero-based page of a group."""
+
+    @property
+    def crawl_groups(self) -> Tuple[str, ...]:
+        """Groups the next crawl covers: the selected ones, or all of them."""
+        return self.selected_groups or self.groups
+
+    @property
+    def crawl_units(self) -> Tuple[str, ...]:
+        return self.crawl_groups
+
+    def configure(
+        self,
+        brands: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Only crawl the given categories (names from CATEGORIES or raw groups)."""
+        super().configure(brands=brands)
+        if not categories:
+            return
+        groups = tuple(self.CATEGORIES.get(name, name) for name in categories)
+        unknown = [
+            name for name, group in zip(categories, groups) if group not in self.groups
+        ]
+        if unknown:
+            raise ValueError(
+                f"{self.__class__.__name__} has no categories {unknown}, "
+                f"choose from {sorted(self.CATEGORIES)}"
+            )
+        self.selected_groups = groups
+
+    def parse(self, response: requests.Response) -> Optional[Columns]:
+        """
+        Parse a single page response into `id`, `price` and `link` columns.
+        Return None when the page has no products, which ends the group.
+        """
+        with METRICS.time("shoex_parse_seconds", source=self.__class__.__name__):
+            if self.parse_pool is not None:
+                chunk = self.parse_pool.submit(
+                    parse_page, self.spec, response.content
+                ).result()
+            else:
+                chunk = parse_page(self.spec, response.content)
+
+        if chunk is None:
+            self.logging.warning("No products found in the response.")
+        return chunk
+
+    async def aparse(self, response: requests.Response) -> Optional[Columns]:
+        """`parse` that waits on the process pool without blocking the loop."""
+        if self.parse_pool is None:
+            return self.parse(response)
+
+        with METRICS.time("shoex_parse_seconds", source=self.__class__.__name__):
+            chunk = await asyncio.wrap_future(
+                self.parse_pool.submit(parse_page, self.spec, response.content)
+            )
+        if chunk is None:
+            self.logging.warning("No products found in the response.")
+        return chunk
+
+    @property
+    def incremental(self) -> bool:
+        """Whether the current crawl may stop early at already known products."""
+        return self._stops_early
+
+    def _full_crawl_due(self) -> bool:
+        """Whether the store's last complete crawl is older than `full_crawl_interval`."""
+        if self.store is None:
+            return True
+        last = self.store.last_complete(self.__class__.__name__)
+        return last is None or time.time() - last >= self.full_crawl_interval
+
+    def stop_when_unchanged(self, known: Dict[str, float]) -> Callable[[Columns], bool]:
+        """
+        Build a predicate telling when a group has been crawled far enough.
+        In incremental mode it is true after `unchanged_pages` pages in a row
+        in which every product is already stored with the same price.
+        """
+        streak = 0
+
+        def is_last(chunk: Columns) -> bool:
+            nonlocal streak
+            if not self.incremental:
+                return False
+            unchanged = all(
+                known.get(str(product_id)) == price
+                for product_id, price in zip(chunk["id"], chunk["price"])
+            )
+            streak = streak + 1 if unchanged else 0
+            return streak >= self.unchanged_pages
+
+        return is_last
+
+    def _start_crawl(self) -> Dict[str, float]:
+        """Reset crawl counters; return known prices for incremental stops."""
+        self.pages_crawled = 0
+        self._crawl_started = time.perf_counter()
+        self._stops_early = self.newest_first and not self._full_crawl_due()
+        if self.store is not None and self.newest_first and not self._stops_early:
+            self.logging.info("Full crawl due, not stopping at known products.")
+        return self.store.prices(self.__class__.__name__) if self.store else {}
+
+    def collect(self, chunk: Columns) -> None:
+        """Append a parsed page to the scraper's rows, dropping repeated offers, and count it."""
+        duplicates = self.rows.duplicates
+        self.rows.extend(chunk)
+        self.pages_crawled += 1
+        source = self.__class__.__name__
+        METRICS.inc("shoex_pages_total", source=source)
+        METRICS.inc("shoex_products_total", chunk_size(chunk), source=source)
+        if self.rows.duplicates > duplicates:
+            METRICS.inc(
+                "shoex_duplicate_offers_total",
+                self.rows.duplicates - duplicates,
+                source=source,
+            )
+        if self.on_page is not None:
+            self.on_page(source, chunk)
+
+    def _report_rate(self) -> None:
+        """Publish the pages and products per second of the finished crawl."""
+        elapsed = time.perf_counter() - self._crawl_started
+        if elapsed <= 0:
+            return
+        source = self.__class__.__name__
+        METRICS.set(
+            "shoex_pages_per_second", self.pages_crawled / elapsed, source=source
+        )
+        METRICS.set(
+            "shoex_products_per_second", len(self.rows) / elapsed, source=source
+        )
+        self.logging.info(
+            f"Crawled {self.pages_crawled} pages, {len(self.rows)} products "
+            f"({self.rows.duplicates} repeated offers dropped) in {elapsed:.1f}s"
+        )
+        self._report_transfer()
+
+    def _crawl_failed(self, group: str, error: Exception) -> bool:
+        """
+        Record a group that failed after retries, keeping the rows collected.
+        Return True if the host's circuit is open and the crawl should end.
+        """
+        self.partial = True
+        self.logging.error(
+            f"Stopped group {group} early after {len(self.rows)} rows: {error}"
+        )
+        return self._breaker().is_open
+
+    def crawl_shard(
+        self, group: str, first_page: int, pages: int
+    ) -> Tuple[Columns, bool]:
+        """
+        Crawl `pages` pages of a group starting at `first_page`, without
+        touching the scraper's rows. Return the parsed rows and whether the
+        group ended within the shard. Request errors are left to the caller.
+        """
+        rows = ColumnAccumulator(RETAILER_SCHEMA)
+        crawled = 0
+        source = self.__class__.__name__
+        for chunk in self.paginate(
+            lambda page: self.page_params(group, first_page + page), self.parse, pages
+        ):
+            rows.extend(chunk)
+            crawled += 1
+            METRICS.inc("shoex_pages_total", source=source)
+            METRICS.inc("shoex_products_total", chunk_size(chunk), source=source)
+        return rows.columns(), crawled < pages
+
+    def publish(
+        self, queue: Optional[Queue] = None, df: Optional[pd.DataFrame] = None
+    ) -> None:
+        """Save the scraper's rows (or `df` built from them) and hand them to the queue."""
+        name = self.__class__.__name__
+        df_concated = self.rows.to_frame() if df is None else df
+
+        if self.history is not None:
+            self.history.record(name, df_concated)
+
+        if self.store is not None:
+            # Only a full crawl of every group may drop products it did not see.
+            complete = not (self.incremental or self.partial or self.selected_groups)
+            self.delta = self.store.update(name, df_concated, complete=complete)
+            self.save_file(self.delta, f"{name}_delta")
+            df_concated = self.store.snapshot(name).astype(RETAILER_SCHEMA)
+
+        self.save_file(df_concated, name)
+        if self.rows.all_offers is not None:
+            self.save_file(self.rows.all_offers.to_frame(), f"{name}_offers")
+
+        if queue is not None:
+            queue.put((name, df_concated))
+            METRICS.set("shoex_result_queue_depth", queue.qsize())
+            self.logging.info("Data added to the queue.")
+
+    def crawl_group(self, group: str, known: Dict[str, float]) -> bool:
+        """
+        Collect the pages of one group.
+        Return False if the host's circuit opened and the crawl should end.
+        """
+        self.logging.info(f"Scraping group: {group}")
+        is_last = self.stop_when_unchanged(known)
+        try:
+            for chunk in self.paginate(
+                lambda page: self.page_params(group, page), self.parse
+            ):
+                self.collect(chunk)
+                if is_last(chunk):
+                    break
+        except requests.exceptions.RequestException as e:
+            return not self._crawl_failed(group, e)
+        self.logging.info(f"Reached the end of group: {group}")
+        return True
+
+    def crawl(self, units: Sequence[str]) -> pd.DataFrame:
+        self.rows.clear()
+        self.partial = False
+        known = self._start_crawl()
+        for group in units:
+            if not self.crawl_group(group, known):
+                break
+        self._report_rate()
+        return self.rows.to_frame()
+
+    def run(self, queue: Optional[Queue] = None) -> None:
+        """Crawl every group and publish the collected results."""
+        self.logging.info(f"Start scraping {self.__class__.__name__}")
+        self.publish(queue, self.crawl(self.crawl_groups))
+
+    async def arun(
+        self, session: "aiohttp.ClientSession", queue: Optional[Queue] = None
+    ) -> None:
+        """Crawl every group on the running event loop."""
+        self.logging.info(f"Start scraping {self.__class__.__name__} (asyncio)")
+        self.rows.clear()
+        self.partial = False
+        known = self._start_crawl()
+
+        for group in self.crawl_groups:
+            self.logging.info(f"Scraping group: {group}")
+            is_last = self.stop_when_unchanged(known)
+            try:
+                async with aclosing(
+                    self.apaginate(
+                        session,
+                        partial(self.page_params, group),
+                        self.aparse,
+                    )
+                ) as pages:
+                    async for chunk in pages:
+                        self.collect(chunk)
+                        if is_last(chunk):
+                            break
+            except requests.exceptions.RequestException as e:
+                if self._crawl_failed(group, e):
+                    break
+                continue
+            self.logging.info(f"Reached the end of group: {group}")
+
+        self._report_rate()
+        await asyncio.to_thread(self.publish, queue)
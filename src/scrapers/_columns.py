@@ -0,0 +1,143 @@
+"""Columnar accumulation of parsed pages."""
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# A parsed page: column name -> values, all lists of the same length.
+Columns = Dict[str, list]
+
+
+def chunk_size(chunk: Columns) -> int:
+    """Number of rows in a column chunk."""
+    return len(next(iter(chunk.values()), []))
+
+
+class ColumnAccumulator:
+    """
+    Append-only column store that builds a single DataFrame at the end.
+
+    Pages are appended as column chunks, so no per-page DataFrame is created
+    and nothing is concatenated. Columns first seen in a later chunk are
+    backfilled with None for the rows before it.
+    """
+
+    def __init__(
+        self,
+        columns: Iterable[str] = (),
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.dtypes = dtypes or {}
+        self._data: Dict[str, List] = {name: [] for name in columns}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def extend(self, chunk: Columns) -> None:
+        """Append a column chunk."""
+        size = chunk_size(chunk)
+        for name in chunk:
+            if name not in self._data:
+                self._data[name] = [None] * self._rows
+        for name, values in self._data.items():
+            values.extend(chunk[name] if name in chunk else [None] * size)
+        self._rows += size
+
+    def clear(self) -> None:
+        """Drop collected rows, keeping the columns."""
+        self._data = {name: [] for name in self._data}
+        self._rows = 0
+
+    def columns(self) -> Columns:
+        """Everything collected so far as a single column chunk."""
+        return {name: list(values) for name, values in self._data.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Build the typed DataFrame of everything collected so far.
+        Each column is built straight into its declared dtype, so no
+        intermediate object-dtype frame is materialized.
+        """
+        return pd.DataFrame(
+            {
+                name: pd.Series(values, dtype=self.dtypes.get(name))
+                for name, values in self._data.items()
+            }
+        )
+
+
+class OfferAccumulator(ColumnAccumulator):
+    """
+    `ColumnAccumulator` keeping one row per offer: the cheapest per `key`.
+
+    Overlapping catalog groups (men's and women's listings, attribute sets
+    returning the same style) list a product several times. Every row is
+    checked against a hash map of the keys collected so far; a repeated key
+    only replaces its earlier row, in place, when it is cheaper, so the
+    merge never multiplies StockX rows. With `all_offers`, every row is also
+    kept in the `all_offers` accumulator, duplicates included.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        columns: Iterable[str] = (),
+        dtypes: Optional[Dict[str, str]] = None,
+        key: str = "id",
+        price: str = "price",
+        all_offers: bool = False,
+    ) -> None:
+        super().__init__(columns, dtypes)
+        self.key = key
+        self.price = price
+        self.all_offers = ColumnAccumulator(columns, dtypes) if all_offers else None
+        # Rows dropped or replaced as duplicates since the last `clear`.
+        self.duplicates = 0
+        self._positions: Dict[Any, int] = {}
+
+    def extend(self, chunk: Columns) -> None:
+        """Append the chunk's new offers and reprice known ones that got cheaper."""
+        if self.all_offers is not None:
+            self.all_offers.extend(chunk)
+        size = chunk_size(chunk)
+        keys = chunk.get(self.key, [None] * size)
+        prices = chunk.get(self.price, [None] * size)
+
+        picked: List[int] = []
+        slots: Dict[Any, int] = {}
+        for row, key in enumerate(keys):
+            if key is None:
+                picked.append(row)
+            elif key in self._positions:
+                self.duplicates += 1
+                position = self._positions[key]
+                if _cheaper(prices[row], self._data[self.price][position]):
+                    for name, values in self._data.items():
+                        values[position] = chunk[name][row] if name in chunk else None
+            elif key in slots:
+                self.duplicates += 1
+                if _cheaper(prices[row], prices[picked[slots[key]]]):
+                    picked[slots[key]] = row
+            else:
+                slots[key] = len(picked)
+                picked.append(row)
+
+        start = self._rows
+        if len(picked) == size:
+            super().extend(chunk)
+        else:
+            super().extend(
+                {name: [values[i] for i in picked] for name, values in chunk.items()}
+            )
+        self._positions.update((key, start + slot) for key, slot in slots.items())
+
+    def clear(self) -> None:
+        super().clear()
+        self.duplicates = 0
+        self._positions = {}
+        if self.all_offers is not None:
+            self.all_offers.clear()
+
+
+def _cheaper(price: Any, than: Any) -> bool:
+    """Whether an offer price beats another one; missing prices never do."""
+    return price is not None and (than is None or price < than)
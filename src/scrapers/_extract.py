@@ -0,0 +1,119 @@
+"""JSON decoding and declarative field extraction for scraper responses."""
+import importlib
+import json
+import logging
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+from ._columns import Columns
+
+
+def _json_backend() -> ModuleType:
+    """orjson when it is installed (an optional speed-up), else the standard library."""
+    try:
+        return importlib.import_module("orjson")
+    except ImportError:  # pragma: no cover - optional speed-up
+        return json
+
+
+json_backend = _json_backend()
+
+# Keys leading from a JSON object to a nested value.
+FieldPath = Tuple[str, ...]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON with orjson when it is installed, else the standard library."""
+    return json_backend.loads(data)
+
+
+def get_path(obj: Any, path: FieldPath) -> Any:
+    """Follow a field path through nested dicts; raise KeyError if it breaks."""
+    for key in path:
+        obj = obj[key]
+    return obj
+
+
+def parse_page(spec: "ExtractSpec", content: bytes) -> Optional[Columns]:
+    """
+    Decode a raw response body and project it through a spec.
+
+    A module-level function of picklable arguments, so it can run in a
+    process pool: only the body bytes go in and plain column lists come back.
+    """
+    try:
+        payload = loads(content)
+    except ValueError as e:
+        logging.error("Failed to parse JSON from response: %s", e)
+        return None
+    return spec.extract(payload)
+
+
+class ExtractSpec:  # pylint: disable=too-few-public-methods
+    """
+    Declarative description of the fields a scraper pulls out of a page.
+
+    `items` points at the list of products in the decoded payload; `fields`
+    maps output columns to paths inside each product. `filters` drop products
+    whose value at a path fails the check, and `transforms` post-process
+    column values. When `required` is set, products missing any field are
+    skipped; otherwise missing values become None.
+
+    Everything here must stay picklable (module-level functions, partials),
+    so a spec can be shipped to parser worker processes.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        items: FieldPath,
+        fields: Dict[str, FieldPath],
+        transforms: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        filters: Sequence[Tuple[FieldPath, Callable[[Any], bool]]] = (),
+        required: bool = True,
+    ) -> None:
+        self.items = items
+        self.fields = fields
+        self.transforms = transforms or {}
+        self.filters = tuple(filters)
+        self.required = required
+
+    def extract(self, payload: Any) -> Optional[Columns]:
+        """Project a decoded page onto columns; None if it has no products."""
+        try:
+            products = get_path(payload, self.items)
+        except (KeyError, TypeError):
+            return None
+        if not products:
+            return None
+
+        columns: Columns = {name: [] for name in self.fields}
+        fields = tuple(self.fields.items())
+        skipped = 0
+
+        for product in products:
+            try:
+                if not all(
+                    check(get_path(product, path)) for path, check in self.filters
+                ):
+                    continue
+                row = [self._value(product, path) for _, path in fields]
+            except KeyError:
+                skipped += 1
+                continue
+            for (name, _), value in zip(fields, row):
+                columns[name].append(value)
+
+        if skipped:
+            logging.warning("Skipped %d products with missing fields.", skipped)
+
+        for name, transform in self.transforms.items():
+            columns[name] = [transform(value) for value in columns[name]]
+        return columns
+
+    def _value(self, product: dict, path: FieldPath) -> Any:
+        if self.required:
+            return get_path(product, path)
+        try:
+            return get_path(product, path)
+        except (KeyError, TypeError):
+            return None
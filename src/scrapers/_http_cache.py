@@ -0,0 +1,131 @@
+"""Disk-backed HTTP response cache shared by the scrapers."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+class ResponseCache:
+    """
+    Cache successful GET responses on disk.
+
+    Entries are keyed on URL plus query params and stored as a JSON metadata
+    file next to the raw body. Freshness is decided by the caller's TTL; stale
+    entries keep their ETag/Last-Modified so the request can be revalidated.
+    The body file's mtime doubles as the last access time for LRU eviction
+    once the cache grows past ``max_bytes``.
+    """
+
+    # The body is stored decoded, so these no longer describe it.
+    _transport_headers = ("content-encoding", "content-length", "transfer-encoding")
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = "http_cache",
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self._bodies())
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        """Build a stable cache key for a request."""
+        query = sorted((params or {}).items())
+        raw = json.dumps([url, query], default=str, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return entry metadata, or None when the key is not cached."""
+        try:
+            with open(self._meta_path(key), encoding="utf-8") as file:
+                entry = json.load(file)
+            os.utime(self._body_path(key))
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def read_body(self, key: str) -> bytes:
+        """Return the cached response body."""
+        return self._body_path(key).read_bytes()
+
+    @staticmethod
+    def is_fresh(entry: dict, ttl: float) -> bool:
+        """Whether an entry is younger than the given TTL in seconds."""
+        return time.time() - entry["stored_at"] < ttl
+
+    @staticmethod
+    def validators(entry: dict) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if entry["headers"].get("etag"):
+            headers["If-None-Match"] = entry["headers"]["etag"]
+        if entry["headers"].get("last-modified"):
+            headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        return headers
+
+    def put(  # pylint: disable=too-many-arguments
+        self, key: str, url: str, status: int, headers: dict, content: bytes
+    ) -> dict:
+        """Store a response and evict least recently used entries if needed."""
+        entry = {
+            "url": url,
+            "status": status,
+            "headers": {
+                k.lower(): v
+                for k, v in headers.items()
+                if k.lower() not in self._transport_headers
+            },
+            "stored_at": time.time(),
+        }
+        body_path = self._body_path(key)
+        previous = body_path.stat().st_size if body_path.exists() else 0
+
+        self._write(body_path, content)
+        self._write(self._meta_path(key), json.dumps(entry).encode("utf-8"))
+
+        with self._lock:
+            self._size += len(content) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+        return entry
+
+    def refresh(self, key: str, entry: dict) -> dict:
+        """Mark a revalidated (304) entry as fresh again."""
+        entry = {**entry, "stored_at": time.time()}
+        self._write(self._meta_path(key), json.dumps(entry).encode("utf-8"))
+        return entry
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits. Holds the lock."""
+        by_access = sorted(self._bodies(), key=lambda path: path.stat().st_mtime)
+        for body_path in by_access:
+            if self._size <= self.max_bytes:
+                break
+            size = body_path.stat().st_size
+            body_path.unlink(missing_ok=True)
+            body_path.with_suffix(".json").unlink(missing_ok=True)
+            self._size -= size
+
+    def _bodies(self) -> list:
+        return list(self.directory.glob("*.body"))
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.body"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        """Write atomically so concurrent readers never see partial files."""
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
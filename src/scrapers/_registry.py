@@ -0,0 +1,42 @@
+"""Registry of scraper classes, imported only when a source is used."""
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Type
+
+if TYPE_CHECKING:
+    from ._base_scraper import BaseScraper
+
+# Source name -> "module:Class" of its scraper. Relative modules live in
+# this package; plugins register absolute ones through `register`.
+SCRAPERS: Dict[str, str] = {
+    "stockx": ".stockx:StockX",
+    "nike": ".nike:Nike",
+    "eobuwie": ".eobuwie:Eobuwie",
+    "adidas": ".adidas:Adidas",
+}
+
+
+def register(name: str, target: str) -> None:
+    """Add (or replace) a source, e.g. ``register("zalando", "plugins.zalando:Zalando")``."""
+    SCRAPERS[name.lower()] = target
+
+
+def available() -> List[str]:
+    """Names of all registered sources."""
+    return list(SCRAPERS)
+
+
+def load(name: str) -> Type["BaseScraper"]:
+    """Import and return a source's scraper class."""
+    try:
+        module_name, class_name = SCRAPERS[name.lower()].split(":")
+    except KeyError:
+        raise ValueError(
+            f"Unknown source {name!r}, choose from {available()}"
+        ) from None
+    module = importlib.import_module(module_name, __package__)
+    return getattr(module, class_name)
+
+
+def create(name: str, **kwargs: Any) -> "BaseScraper":
+    """Instantiate a source's scraper."""
+    return load(name)(**kwargs)
@@ -0,0 +1,24 @@
+"""Declared column types of the frames each source produces."""
+from typing import Dict, Optional, Sequence
+
+# Text lives in Arrow buffers instead of one Python object per cell, and
+# keeps its type through concatenation across pages and sources, which
+# categoricals with different categories do not.
+TEXT = "string[pyarrow]"
+
+# Retailer offers. Prices stay float64 so they compare exactly with the
+# prices kept in the product store and the price history.
+RETAILER_SCHEMA: Dict[str, str] = {"id": TEXT, "price": "float64", "link": TEXT}
+
+
+def stockx_schema(market_columns: Optional[Sequence[str]]) -> Dict[str, str]:
+    """
+    StockX products: text columns and float32 market fields (USD prices,
+    counts and ratios, all exact or well within float32 precision).
+    Without a column list every market field is kept with its parsed type.
+    """
+    return {
+        "Title": TEXT,
+        "styleId": TEXT,
+        **dict.fromkeys(market_columns or (), "float32"),
+    }
@@ -0,0 +1,127 @@
+"""Per-host request pacing, retry backoff and circuit breaking."""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host that keeps failing."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with additive-increase/multiplicative-decrease.
+
+    Each request takes a token; tokens refill at `rate` per second up to
+    `burst`. Throttling responses halve the rate (and can pause the bucket
+    for a Retry-After period), successes slowly raise it back to `max_rate`,
+    so the pace settles at what the host tolerates.
+    """
+
+    def __init__(
+        self, rate: float, burst: Optional[float] = None, min_rate: float = 0.2
+    ):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; return how many seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def slow_down(self, retry_after: Optional[float] = None) -> None:
+        """Halve the rate, and hold every request for `retry_after` seconds."""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                # Owe `retry_after` seconds' worth of tokens.
+                debt = retry_after * self.rate
+                self.tokens = min(self.tokens, -debt)
+
+    def speed_up(self) -> None:
+        """Raise the rate a little after a successful request."""
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class CircuitBreaker:
+    """
+    Stop calling a host after `threshold` consecutive failures.
+
+    Once open, requests fail fast for `cooldown` seconds; the next request
+    after that is let through, and a success closes the breaker again.
+    """
+
+    def __init__(self, threshold: int = 8, cooldown: float = 60.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests should currently be refused."""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            return time.monotonic() - self.opened_at < self.cooldown
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int, base: float, cap: float, retry_after: Optional[float] = None
+) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2**attempt))  # nosec B311
+    return max(delay, retry_after or 0.0)
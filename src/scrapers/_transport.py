@@ -0,0 +1,134 @@
+"""HTTP sessions: compressed transfers, pools sized to concurrency and optional HTTP/2."""
+import io
+import logging
+import weakref
+from typing import Any, Mapping, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+# Content codings asked for: br is decoded by brotli (in requirements.txt),
+# which urllib3, httpx and aiohttp all use. zstd is not offered, because the
+# pinned httpx cannot decode it.
+ACCEPT_ENCODING = "gzip, deflate, br"
+
+# Wire sizes of responses whose body was not read through urllib3.
+_wire_sizes: "weakref.WeakKeyDictionary[requests.Response, int]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def make_session(pool_size: int, http2: bool = False) -> requests.Session:
+    """
+    A `requests` session keeping up to `pool_size` connections per host
+    alive, so `pool_size` concurrent requests never open throwaway
+    connections. With `http2` and httpx (with h2) installed, HTTPS requests
+    are multiplexed over HTTP/2 where the server supports it instead.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=pool_size))
+    adapter: BaseAdapter = HTTPAdapter(pool_maxsize=pool_size)
+    if http2:
+        try:
+            adapter = HTTP2Adapter(pool_size)
+        except ImportError as e:
+            logging.warning("HTTP/2 needs httpx[http2], using HTTP/1.1: %s", e)
+    session.mount("https://", adapter)
+    return session
+
+
+def set_wire_size(response: requests.Response, size: int) -> None:
+    """Record the wire size of a response built from another client's one."""
+    _wire_sizes[response] = size
+
+
+def wire_size(response: requests.Response) -> int:
+    """Bytes a response body took on the wire, before content decoding."""
+    if response in _wire_sizes:
+        return _wire_sizes[response]
+    tell = getattr(response.raw, "tell", None)
+    if tell is not None:
+        try:
+            return int(tell())
+        except (TypeError, ValueError, OSError):
+            pass
+    return content_length(response.headers, len(response.content))
+
+
+def content_length(headers: Mapping[str, str], default: int) -> int:
+    """The Content-Length header, or `default` when it is missing."""
+    length = headers.get("content-length", "")
+    return int(length) if length.isdigit() else default
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    `requests` transport adapter sending requests through an httpx client,
+    which negotiates HTTP/2 over TLS and multiplexes concurrent requests to
+    a host on one connection. Responses are returned as `requests` ones.
+    """
+
+    def __init__(self, pool_size: int) -> None:
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        super().__init__()
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+
+    def send(  # pylint: disable=too-many-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> requests.Response:
+        if request.method is None or request.url is None:
+            raise ValueError("HTTP2Adapter can only send prepared requests")
+        try:
+            r = self._client.request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=request.body,
+                timeout=timeout,
+            )
+        except self._httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e), request=request) from e
+        except self._httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request) from e
+
+        response = requests.Response()
+        response.request = request
+        response.url = str(r.url)
+        response.status_code = r.status_code
+        response.reason = r.reason_phrase
+        response.headers = CaseInsensitiveDict(r.headers)
+        response._content = r.content  # pylint: disable=protected-access
+        # A raw body for requests' redirect and close handling; the content
+        # is already decoded, so it carries no content coding.
+        response.raw = HTTPResponse(
+            body=io.BytesIO(r.content),
+            headers={
+                name: value
+                for name, value in r.headers.items()
+                if name.lower() not in ("content-encoding", "content-length")
+            },
+            status=r.status_code,
+            reason=r.reason_phrase,
+            preload_content=False,
+            decode_content=False,
+        )
+        set_wire_size(response, r.num_bytes_downloaded)
+        return response
+
+    def close(self) -> None:
+        self._client.close()
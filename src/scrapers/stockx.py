@@ -1,29 +1,91 @@
 """StockX scraper module."""
 
-import json
-import time
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from queue import Queue
-from typing import Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlencode
 
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+import requests
 
 from logger_module import get_logger
+from metrics import METRICS
 
 from ._base_scraper import BaseScraper
+from ._columns import ColumnAccumulator, Columns
+from ._extract import ExtractSpec, loads
+from ._schema import stockx_schema
 
+if TYPE_CHECKING:
+    from selenium import webdriver
 
-class StockX(BaseScraper):
-    """Scraper for fetching shoe data from StockX."""
 
-    def __init__(self, results_per_page: str = "1000"):
+class StockX(BaseScraper):  # pylint: disable=too-many-instance-attributes
+    """
+    Scraper for fetching shoe data from StockX.
+
+    The browser is only used once to pass the bot checks; its cookies and
+    user agent are then copied to the pooled `requests` session, which pulls
+    the browse API JSON directly. Brands that the session cannot fetch fall
+    back to loading the API page in the browser. Selenium is only imported
+    once the browser is actually needed.
+
+    A browse query only pages through its first `max_results` results, so
+    brands with more are split into disjoint shards, by gender and then by
+    lowest ask bucket, until each shard fits. Shard pages are fetched
+    concurrently, products are deduplicated on their id, and every brand's
+    products are checked against the total the API reports for it.
+    """
+
+    ID_COLUMN = "styleId"
+    PRICE_COLUMN = "averageDeadstockPrice"
+
+    # Market fields used downstream; pass market_columns=None to keep all.
+    MARKET_COLUMNS = (
+        "lowestAsk",
+        "highestBid",
+        "numberOfAsks",
+        "numberOfBids",
+        "lastSale",
+        "averageDeadstockPrice",
+        "deadstockSold",
+        "salesLast72Hours",
+        "volatility",
+        "pricePremium",
+    )
+
+    # Browse filters splitting a query into disjoint shards, in the order
+    # they are applied to queries with too many results.
+    SHARD_FILTERS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+        (
+            "gender",
+            ("men", "women", "unisex", "child", "preschool", "toddler", "infant"),
+        ),
+        (
+            "market.lowestAsk",
+            tuple(
+                f"range({low}|{high})"
+                for low, high in zip(
+                    (0, 100, 150, 200, 250, 300, 400, 600),
+                    (100, 150, 200, 250, 300, 400, 600, 100_000),
+                )
+            ),
+        ),
+    )
+
+    def __init__(
+        self,
+        results_per_page: int = 100,
+        market_columns: Optional[Sequence[str]] = MARKET_COLUMNS,
+    ):
         """Initialize the scraper with search parameters."""
         super().__init__()
         self.logging = get_logger(self.__class__.__name__)
         self.logging.info("Initializing StockX scraper.")
+        self.url = "https://stockx.com/api/browse"
+        self.home_url = "https://stockx.com/"
         self.query = [
             "jordan",
             "nike",
@@ -33,60 +95,299 @@ class StockX(BaseScraper):
             "new balance",
         ]
         self.results_per_page = results_per_page
-        self.driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install())
+        # Results a single browse query can page through.
+        self.max_results = 1000
+        # Set when some brand's products fell short of the reported total.
+        self.partial = False
+        self.page_load_timeout = 15
+        self.cache_ttl = 10 * 60
+        schema = stockx_schema(market_columns)
+        self.rows = ColumnAccumulator(schema, schema)
+        self.market_columns = market_columns
+        self.spec = ExtractSpec(
+            items=("Products",),
+            fields={
+                "Title": ("title",),
+                "styleId": ("styleId",),
+                **{key: ("market", key) for key in market_columns or ()},
+            },
+            required=False,
         )
+        self._driver: Optional["webdriver.Chrome"] = None
+        self._browser_lock = threading.Lock()
+        self._session_ready = False
 
-    def get_data(self, brand: str) -> Dict:
-        """Fetch the raw data from the StockX API for a specific brand."""
-        self.logging.info(f"Fetching data from StockX for brand {brand}.")
-
-        url = f"https://stockx.com/api/browse?_search={brand}&resultsPerPage={self.results_per_page}"
-        self.driver.get(url)
-        time.sleep(2)  # Allow the page to load
-        page_source = self.driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-        json_data = soup.find("pre").text
-
-        self.logging.info("Data fetched successfully.")
-        return json.loads(json_data)
-
-    def parse(self, data: Dict) -> pd.DataFrame:
-        """Parse the raw data to create a DataFrame."""
-        self.logging.info("Parsing raw data into DataFrame.")
-
-        product_list = [
-            {
-                **{
-                    "Title": product.get("title", None),
-                    "styleId": product.get("styleId", None),
-                },
-                **{key: product["market"].get(key, None) for key in product["market"]},
-            }
-            for product in data["Products"]
-        ]
+    @property
+    def driver(self) -> "webdriver.Chrome":
+        """Chrome instance, launched on first use."""
+        # pylint: disable=import-outside-toplevel
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        if self._driver is None:
+            self.logging.info("Launching Chrome.")
+            self._driver = webdriver.Chrome(
+                service=ChromeService(ChromeDriverManager().install())
+            )
+        return self._driver
+
+    def close(self) -> None:
+        """Quit the browser if it was launched."""
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+    def prepare_session(self) -> bool:
+        """
+        Load StockX once in the browser and hand its cookies to the session.
+        The browser is closed afterwards; return whether it succeeded.
+        """
+        # pylint: disable=import-outside-toplevel
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.logging.info("Preparing StockX session through the browser.")
+        try:
+            self.driver.get(self.home_url)
+            WebDriverWait(self.driver, self.page_load_timeout).until(
+                lambda driver: driver.execute_script("return document.readyState")
+                == "complete"
+            )
+            self.headers["user-agent"] = self.driver.execute_script(
+                "return navigator.userAgent"
+            )
+            for cookie in self.driver.get_cookies():
+                self._session.cookies.set(
+                    cookie["name"], cookie["value"], domain=cookie.get("domain")
+                )
+        except WebDriverException as e:
+            self.logging.error(f"Failed to prepare StockX session: {e}")
+            return False
+        finally:
+            self.close()
+
+        return True
+
+    def configure(
+        self,
+        brands: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Only search the given brands."""
+        super().configure(categories=categories)
+        if brands:
+            self.query = list(brands)
+
+    @property
+    def crawl_units(self) -> Tuple[str, ...]:
+        return tuple(self.query)
+
+    def crawl(self, units: Sequence[str]) -> pd.DataFrame:
+        """
+        Fetch the given brands, shard by shard and page by page, with up to
+        `max_in_flight` requests at once. The session (or the browser it fell
+        back to) stays open for the next crawl; `close` quits the browser.
+        """
+        # pylint: disable=too-many-locals
+        if not self._session_ready:
+            self._session_ready = self.prepare_session()
+        self.rows.clear()
+        self.partial = False
+        totals: Dict[str, int] = {}
+        found: Dict[str, Set[str]] = {brand: set() for brand in units}
+        seen: Set[str] = set()
+        pending: Dict[Future, Tuple[str, Dict[str, str], int]] = {}
+        skipped = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+
+            def submit(brand: str, filters: Dict[str, str], page: int) -> None:
+                params = self.browse_params(brand, filters, page)
+                pending[executor.submit(self.get_data, params)] = (brand, filters, page)
+
+            for brand in units:
+                self.logging.info(f"Fetching data from StockX for brand {brand}.")
+                submit(brand, {}, 1)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    brand, filters, page = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        # The rest of the crawl goes on; this page's products
+                        # are missing, so the catalog is incomplete.
+                        self.logging.error(
+                            f"StockX page {page} of {brand} {filters} failed: {e}"
+                        )
+                        self.partial = True
+                        continue
+                    if page == 1:
+                        total = int(data.get("Pagination", {}).get("total") or 0)
+                        if not filters:
+                            totals[brand] = total
+                        shards = self.split(filters) if total > self.max_results else []
+                        for shard in shards:
+                            submit(brand, shard, 1)
+                        if not shards:
+                            for next_page in range(2, self.page_count(total) + 1):
+                                submit(brand, filters, next_page)
+                    products, keyless = self.new_products(data, found[brand], seen)
+                    skipped += keyless
+                    self.rows.extend(self.parse(products))
+
+        if skipped:
+            self.logging.warning(f"Skipped {skipped} StockX products without an id.")
+        self.check_completeness(totals, found)
+        self._report_transfer()
+        return self.rows.to_frame()
 
+    def browse_params(
+        self, brand: str, filters: Dict[str, str], page: int
+    ) -> Dict[str, Any]:
+        """Browse API parameters of one page of a brand's shard."""
+        return {
+            "_search": brand,
+            "resultsPerPage": self.results_per_page,
+            "page": page,
+            **filters,
+        }
+
+    def split(self, filters: Dict[str, str]) -> List[Dict[str, str]]:
+        """
+        Disjoint shards of a query, on the first `SHARD_FILTERS` dimension it
+        does not filter on yet; none once every dimension is used.
+        """
+        for name, values in self.SHARD_FILTERS:
+            if name not in filters:
+                return [{**filters, name: value} for value in values]
+        self.logging.warning(f"Cannot split StockX query {filters} any further.")
+        return []
+
+    def page_count(self, total: int) -> int:
+        """Pages of a query with `total` results that the API lets us reach."""
+        return math.ceil(min(total, self.max_results) / self.results_per_page)
+
+    @staticmethod
+    def new_products(data: Dict, found: Set[str], seen: Set[str]) -> Tuple[Dict, int]:
+        """
+        The page's products not seen in this crawl yet, and how many products
+        without any id were skipped. Ids are added to the brand's `found` set
+        and to the crawl-wide `seen` one.
+        """
+        products = []
+        keyless = 0
+        for product in data.get("Products") or []:
+            key = product.get("id") or product.get("uuid") or product.get("styleId")
+            if not key:
+                keyless += 1
+                continue
+            key = str(key)
+            found.add(key)
+            if key not in seen:
+                seen.add(key)
+                products.append(product)
+        return {"Products": products}, keyless
+
+    def check_completeness(
+        self, totals: Dict[str, int], found: Dict[str, Set[str]]
+    ) -> None:
+        """Compare the products found per brand with the totals the API reported."""
+        for brand, keys in found.items():
+            total = totals.get(brand, 0)
+            coverage = len(keys) / total if total else 1.0
+            METRICS.set("shoex_stockx_coverage", coverage, brand=brand)
+            if len(keys) < total:
+                self.partial = True
+                self.logging.warning(
+                    f"Found {len(keys)} of {total} StockX products for {brand} ({coverage:.1%})."
+                )
+            else:
+                self.logging.info(f"Found all {total} StockX products for {brand}.")
+
+    def get_data(self, params: Dict[str, Any]) -> Dict:
+        """Fetch one page of the StockX browse API."""
+        if self._session_ready:
+            try:
+                return self.decode(self._get(params=params))
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.logging.warning(
+                    f"Session fetch failed for {params}, using the browser from now on: {e}"
+                )
+                self._session_ready = False
+
+        with self._browser_lock:
+            return self.get_data_from_browser(params)
+
+    def get_data_from_browser(self, params: Dict[str, Any]) -> Dict:
+        """Load the API page in the browser and read the JSON it renders."""
+        # pylint: disable=import-outside-toplevel
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.driver.get(f"{self.url}?{urlencode(params)}")
+        pre = WebDriverWait(self.driver, self.page_load_timeout).until(
+            expected_conditions.presence_of_element_located((By.TAG_NAME, "pre"))
+        )
+
+        self.logging.info("Data fetched successfully through the browser.")
+        return loads(pre.text)
+
+    def parse(self, data: Dict) -> Columns:
+        """Parse the raw data into columns."""
+        self.logging.info("Parsing raw data into columns.")
+
+        with METRICS.time("shoex_parse_seconds", source=self.__class__.__name__):
+            if self.market_columns is not None:
+                chunk = self.spec.extract(data) or {}
+            else:
+                chunk = self.parse_all_market_columns(data)
+
+        source = self.__class__.__name__
+        METRICS.inc("shoex_pages_total", source=source)
+        METRICS.inc(
+            "shoex_products_total", len(chunk.get("styleId", ())), source=source
+        )
         self.logging.info("Data parsed successfully.")
-        return pd.DataFrame(product_list)
+        return chunk
 
-    def run(self, queue: Queue) -> None:
+    @staticmethod
+    def parse_all_market_columns(data: Dict) -> Columns:
+        """Parse every market field any product carries."""
+        products = data["Products"]
+        market_keys = dict.fromkeys(
+            key for product in products for key in product["market"]
+        )
+
+        chunk: Columns = {
+            "Title": [product.get("title", None) for product in products],
+            "styleId": [product.get("styleId", None) for product in products],
+        }
+        for key in market_keys:
+            chunk[key] = [product["market"].get(key, None) for product in products]
+        return chunk
+
+    def run(self, queue: Optional[Queue] = None) -> None:
         """Main function that orchestrates the scraping process."""
         self.logging.info("Starting StockX scraper.")
 
-        final_df = pd.DataFrame()
+        try:
+            final_df = self.crawl(self.query)
+        finally:
+            self.close()
 
-        for brand in self.query:
-            data = self.get_data(brand)
-            df = self.parse(data)
-
-            final_df = pd.concat([final_df, df], ignore_index=True)
+        if self.history is not None and self.PRICE_COLUMN in final_df:
+            self.history.record(
+                self.__class__.__name__, final_df, self.ID_COLUMN, self.PRICE_COLUMN
+            )
 
         if queue is not None:
             queue.put((self.__class__.__name__, final_df))
+            METRICS.set("shoex_result_queue_depth", queue.qsize())
             self.logging.info("DataFrame added to queue.")
 
-        self.driver.close()
-
         BaseScraper.save_file(final_df, self.__class__.__name__)
 
         self.logging.info("StockX scraper finished.")
@@ -1,77 +1,255 @@
 """Analyze results of scraping."""
-from typing import List
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
-import requests
 
+from exchange_rates import DEFAULT_USD_TO_PLN, ExchangeRateProvider
 from logger_module import get_logger
+from price_history import PriceHistory
 
+# StockX transaction fee by seller level.
+SELLER_LEVEL_FEES = {1: 0.09, 2: 0.085, 3: 0.08, 4: 0.075, 5: 0.07}
 
-class Analyzer:
+# Offer columns kept in the scenario analysis result.
+SCENARIO_COLUMNS = ("id", "price", "link", "Title", "styleId")
+
+
+class Analyzer:  # pylint: disable=too-many-instance-attributes
     """Analyzer class."""
 
-    def __init__(self, df: pd.DataFrame) -> None:
-        """Initialize the Analyzer with a DataFrame."""
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        rates: Optional[ExchangeRateProvider] = None,
+        valuation_date: Optional[date] = None,
+        history: Optional[PriceHistory] = None,
+    ) -> None:
+        """
+        Initialize the Analyzer with a DataFrame.
+        StockX prices are converted at the `rates` rate of `valuation_date`
+        (today by default), or at a fixed default rate without a provider.
+        With a price `history`, StockX trend signals become filter inputs.
+        """
         self.logging = get_logger(self.__class__.__name__)
         self.df = df
+        self.rates = rates
+        self.valuation_date = valuation_date
+        self.history = history
         self.transaction_fee = 0.09
         self.payment_proc = 0.03
-        self._usd_to_pln: float = 4.0
+        self.delivery_cost_usd = 5.45
+        # Trend filters over the last `trend_days` of StockX history; None disables them.
+        self.trend_days = 30
+        self.min_trend_pct: Optional[float] = None
+        self.max_trend_volatility: Optional[float] = None
+        self._usd_to_pln: Optional[float] = None
+        self._trend_signals: Optional[pd.DataFrame] = None
 
     @property
     def usd_to_pln(self) -> float:
-        """Lazy-load USD to PLN conversion rate."""
+        """
+        USD to PLN rate of the valuation date, looked up once in the cache.
+        A running prefetch is waited for first (up to the provider's timeout),
+        so the rate read before the first page is never the fallback one.
+        """
         if self._usd_to_pln is None:
-            try:
-                api = "http://api.nbp.pl/api/exchangerates/rates/A/USD/"
-                r = requests.get(api, timeout=10)
-                r.raise_for_status()
-                self._usd_to_pln = float(r.json()["rates"][0]["mid"])
-            except requests.RequestException:
-                self.logging.warning("Error fetching exchange rate, defaulting to 4.")
+            if self.rates is None:
+                self._usd_to_pln = DEFAULT_USD_TO_PLN
+            else:
+                self.rates.wait(self.rates.timeout)
+                self._usd_to_pln = self.rates.rate(self.valuation_date)
+            self.logging.info(f"Converting USD to PLN at {self._usd_to_pln}.")
         return self._usd_to_pln
 
     def usd_prices_to_pln(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
-        """Convert given columns from USD to PLN."""
-        df = df.copy()
+        """Convert given columns from USD to PLN in place and return the frame."""
         for column in columns:
-            df[column] = (df[column] * self.usd_to_pln).apply(float).round(2)
+            df[column] = (df[column].to_numpy(dtype="float64") * self.usd_to_pln).round(
+                2
+            )
         return df
 
-    def format_df(self) -> pd.DataFrame:
-        """Format the DataFrame for analysis."""
-        df = self.df.dropna(subset=["id"]).copy()
+    def format_df(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Format the DataFrame (or another merged frame) for analysis.
+        Only rows with an offer are taken; other columns are shared with the
+        source frame, which is left untouched, instead of being copied.
+        """
+        df = self.df if df is None else df
+        if df["id"].hasnans:
+            df = df.take(np.flatnonzero(df["id"].notna()))
+        else:
+            df = df.copy(deep=False)
         cols_to_format = [
             "averageDeadstockPrice",
             "highestBid",
             "lowestAsk",
-            "volatility",
             "lastSale",
         ]
+        if self.history is not None:
+            df = self.with_trends(df)
+            cols_to_format.append("stockxMinPrice")
         df = self.usd_prices_to_pln(df, cols_to_format)
 
-        delivery_cost_usd = 5.45
-        df["finalPriceAfterTaxes"] = (
-            df["averageDeadstockPrice"]
-            - df["averageDeadstockPrice"] * self.payment_proc
-            - df["averageDeadstockPrice"] * self.transaction_fee
-            - delivery_cost_usd * self.usd_to_pln
-        ).round(2)
-
+        df["finalPriceAfterTaxes"] = self.payout(df["averageDeadstockPrice"])
         df["profitOrLoss"] = df["finalPriceAfterTaxes"] - df["price"]
         return df
 
-    def analyze(self) -> pd.DataFrame:
-        """Perform the analysis and return filtered DataFrame."""
-        df = self.format_df()
+    def payout(self, average: Any) -> Any:
+        """
+        What a StockX sale at the given PLN price (a number or a column)
+        pays out after fees and delivery, rounded to grosz.
+        """
+        return np.round(
+            average
+            - average * self.payment_proc
+            - average * self.transaction_fee
+            - self.delivery_cost_usd * self.usd_to_pln,
+            2,
+        )
+
+    def analyze(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Perform the analysis and return filtered DataFrame.
+        Pass `df` to score another merged frame with the same settings.
+        """
+        df = self.format_df(df)
 
         filter_conditions = (
             (df["profitOrLoss"] > 50)
             & (df["numberOfBids"] > 0)
             & (df["volatility"] < 1)
+            & self.trend_filter(df)
         )
 
         filtered_df = df[filter_conditions]
         self.logging.info(f"Found {len(filtered_df)} profitable opportunities.")
 
         return filtered_df
+
+    @property
+    def trend_signals(self) -> pd.DataFrame:
+        """
+        StockX trend signals by product id over the `trend_days` before the
+        valuation date, queried from the history once per analyzer (a new
+        analyzer is built for every StockX reference refresh).
+        """
+        if self._trend_signals is None:
+            until = (
+                datetime.combine(self.valuation_date, time.max)
+                if self.valuation_date
+                else None
+            )
+            self._trend_signals = self.history.signals(
+                "StockX", self.trend_days, until
+            ).set_index("id")
+        return self._trend_signals
+
+    def with_trends(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add StockX trend signals from the price history by `styleId`:
+        `stockxTrendPct`, `stockxTrendVolatility` and `stockxMinPrice` (USD).
+        Columns are added to `df` itself, without a merge copying the frame.
+        """
+        signals = self.trend_signals
+        style_ids = df["styleId"].astype(object)
+        for column, signal in (
+            ("stockxTrendPct", "change_pct"),
+            ("stockxTrendVolatility", "volatility"),
+            ("stockxMinPrice", "min_price"),
+        ):
+            df[column] = style_ids.map(signals[signal]).astype("float64")
+        return df
+
+    def trend_filter(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Rows passing the configured trend filters.
+        Products without enough history are kept.
+        """
+        keep = pd.Series(True, index=df.index)
+        if self.history is None:
+            return keep
+        if self.min_trend_pct is not None:
+            keep &= df["stockxTrendPct"].fillna(0) >= self.min_trend_pct
+        if self.max_trend_volatility is not None:
+            keep &= df["stockxTrendVolatility"].fillna(0) <= self.max_trend_volatility
+        return keep
+
+    def scenario_grid(
+        self,
+        seller_levels: Sequence[int] = (1,),
+        payment_procs: Optional[Sequence[float]] = None,
+        usd_to_pln: Optional[Sequence[float]] = None,
+        delivery_costs_usd: Optional[Sequence[float]] = None,
+    ) -> pd.DataFrame:
+        """
+        Every combination of the given assumptions, one scenario per row.
+        Assumptions left out use the analyzer's own fee, FX rate and delivery cost.
+        """
+        grid = pd.MultiIndex.from_product(
+            [
+                seller_levels,
+                payment_procs or (self.payment_proc,),
+                usd_to_pln or (self.usd_to_pln,),
+                delivery_costs_usd or (self.delivery_cost_usd,),
+            ],
+            names=["seller_level", "payment_proc", "usd_to_pln", "delivery_cost_usd"],
+        ).to_frame(index=False)
+        grid.insert(1, "transaction_fee", grid["seller_level"].map(SELLER_LEVEL_FEES))
+        grid.index.name = "scenario"
+        return grid
+
+    @staticmethod
+    def profit_matrix(df: pd.DataFrame, scenarios: pd.DataFrame) -> np.ndarray:
+        """
+        Profit in PLN of every offer (rows) under every scenario (columns).
+        Computed in one broadcast pass over the StockX USD prices.
+        """
+        average = df["averageDeadstockPrice"].to_numpy(dtype="float64")[:, None]
+        price = df["price"].to_numpy(dtype="float64")[:, None]
+        keep = 1 - (scenarios["transaction_fee"] + scenarios["payment_proc"]).to_numpy()
+        fx = scenarios["usd_to_pln"].to_numpy(dtype="float64")
+        delivery = scenarios["delivery_cost_usd"].to_numpy(dtype="float64")
+        return ((average * keep - delivery) * fx - price).astype("float32")
+
+    def analyze_scenarios(
+        self,
+        scenarios: Optional[pd.DataFrame] = None,
+        min_profit: float = 50,
+        max_volatility: float = 1,
+    ) -> pd.DataFrame:
+        """
+        Evaluate every offer against every scenario of a `scenario_grid`.
+
+        Applies the filters of `analyze` per scenario and returns one row per
+        profitable (offer, scenario) pair: the scenario number, the offer's
+        identifying columns and its profit under that scenario.
+        """
+        if scenarios is None:
+            scenarios = self.scenario_grid()
+
+        df = self.df.dropna(subset=["id"])
+        if self.history is not None:
+            df = self.with_trends(df.copy(deep=False))
+        df = df[
+            (df["numberOfBids"] > 0)
+            & (df["volatility"] < max_volatility)
+            & self.trend_filter(df)
+        ]
+
+        profits = self.profit_matrix(df, scenarios)
+        rows, cols = np.nonzero(profits > min_profit)
+
+        result = df[[c for c in SCENARIO_COLUMNS if c in df.columns]].iloc[rows]
+        result = result.reset_index(drop=True)
+        result.insert(0, "scenario", scenarios.index.to_numpy()[cols])
+        result["profitOrLoss"] = profits[rows, cols].astype("float64").round(2)
+
+        counts = np.bincount(cols, minlength=len(scenarios))
+        self.logging.info(
+            f"Evaluated {len(df)} offers in {len(scenarios)} scenarios; "
+            f"opportunities per scenario: {counts.tolist()}"
+        )
+        return result
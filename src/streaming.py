@@ -0,0 +1,111 @@
+"""Score retailer pages against StockX while the scrapers are still running."""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Set, Tuple, Union
+
+import pandas as pd
+
+from logger_module import get_logger
+from metrics import METRICS
+from scrapers._columns import Columns
+from shoes_purchase_analyzer import Analyzer
+from style_matching import StyleIndex
+
+# Columns written for every deal.
+DEAL_COLUMNS = (
+    "source",
+    "id",
+    "price",
+    "link",
+    "Title",
+    "styleId",
+    "averageDeadstockPrice",
+    "finalPriceAfterTaxes",
+    "profitOrLoss",
+)
+
+
+class DealStream:  # pylint: disable=too-many-instance-attributes
+    """
+    Match and score each parsed retailer page as soon as it arrives.
+
+    Pages are joined to a prebuilt `StyleIndex` of the StockX catalog and run
+    through the analyzer's filters. Profitable offers are appended to a JSON
+    lines file (one deal per line, flushed immediately), so they can be
+    acted on before the slowest scraper finishes. Use `on_page` as a
+    scraper's page callback; it is safe to call from several threads.
+    """
+
+    def __init__(
+        self, index: StyleIndex, analyzer: Analyzer, path: Union[str, Path]
+    ) -> None:
+        self.logging = get_logger(self.__class__.__name__)
+        self.index = index
+        self.analyzer = analyzer
+        self.path = Path(path)
+        self.started = time.perf_counter()
+        self.deals = 0
+        self._seen: Set[Tuple[str, str, str, str]] = set()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Kept open for the stream's lifetime; `close` closes it.
+        self._file = open(  # pylint: disable=consider-using-with
+            self.path, "a", encoding="utf-8"
+        )
+
+    def set_reference(self, index: StyleIndex, analyzer: Analyzer) -> None:
+        """Score the next pages against a refreshed StockX catalog."""
+        with self._lock:
+            self.index = index
+            self.analyzer = analyzer
+
+    def on_page(self, source: str, chunk: Columns) -> None:
+        """Score one parsed page and publish its new deals."""
+        with self._lock:
+            index, analyzer = self.index, self.analyzer
+        with METRICS.time("shoex_stream_page_seconds", source=source):
+            matched = index.match_offers(pd.DataFrame(chunk))
+            if matched.empty:
+                return
+            deals = analyzer.analyze(matched)
+        if not deals.empty:
+            self.publish(source, deals)
+
+    def publish(self, source: str, deals: pd.DataFrame) -> None:
+        """Append deals not published yet (or since repriced) to the output file."""
+        deals = deals.assign(source=source)
+        columns = [c for c in DEAL_COLUMNS if c in deals.columns]
+        elapsed = time.perf_counter() - self.started
+
+        with self._lock:
+            new = []
+            for record in deals[columns].to_dict("records"):
+                key = (
+                    source,
+                    str(record["id"]),
+                    str(record.get("styleId")),
+                    str(record["price"]),
+                )
+                if key not in self._seen:
+                    self._seen.add(key)
+                    new.append(record)
+            for record in new:
+                record["detected_after_s"] = round(elapsed, 3)
+                self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+            self.deals += len(new)
+
+        if new:
+            METRICS.inc("shoex_deals_total", len(new), source=source)
+            METRICS.observe("shoex_deal_detection_seconds", elapsed, source=source)
+            self.logging.info(
+                f"{len(new)} new deals from {source} after {elapsed:.1f}s."
+            )
+
+    def close(self) -> None:
+        """Close the output file."""
+        self._file.close()
+        self.logging.info(f"Published {self.deals} deals to {self.path}.")
@@ -0,0 +1,151 @@
+"""Match retailer offers to StockX products by normalized style code."""
+import re
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from logger_module import get_logger
+
+# Separators between several style codes packed into one StockX styleId.
+MULTI_CODE_SEPARATORS = r"[/,;|]"
+
+# Everything but ASCII letters and digits, once upper-cased.
+NON_CODE_CHARACTERS = r"[^0-9A-Z]"
+
+
+def normalize_style_code(code: str) -> str:
+    """
+    Canonical form of a style code: upper case, ASCII letters and digits only.
+    'dd1391-100', 'DD1391 100' and 'DD1391_100' all become 'DD1391100'.
+    """
+    return re.sub(NON_CODE_CHARACTERS, "", str(code).upper())
+
+
+def normalize_style_codes(codes: pd.Series) -> pd.Series:
+    """Vectorized `normalize_style_code`; missing codes stay missing."""
+    return (
+        codes.astype("string")
+        .str.upper()
+        .str.replace(NON_CODE_CHARACTERS, "", regex=True)
+        .replace("", pd.NA)
+    )
+
+
+class StyleIndex:
+    """
+    Hash index from normalized style codes to StockX catalog rows.
+
+    Built once per StockX catalog; multi-code styleIds are split so each code
+    points at its product. `match` then joins any number of retailer frames
+    against it, keeping every StockX row like a left merge does.
+    """
+
+    def __init__(self, df_stockx: pd.DataFrame, column: str = "styleId") -> None:
+        """Index the style codes of a StockX DataFrame."""
+        self.logging = get_logger(self.__class__.__name__)
+        self.stockx = df_stockx.reset_index(drop=True)
+
+        codes = (
+            self.stockx[column]
+            .astype("string")
+            .str.split(MULTI_CODE_SEPARATORS)
+            .explode()
+        )
+        keys = pd.DataFrame(
+            {"key": normalize_style_codes(codes).to_numpy(), "_stockx_row": codes.index}
+        )
+        self.keys = keys.dropna(subset=["key"]).drop_duplicates()
+        self.report: Dict[str, Union[int, float]] = {}
+        self._rows_by_key: Optional[Dict[str, np.ndarray]] = None
+
+        self.logging.info(
+            f"Indexed {len(self.keys)} style codes of {len(self.stockx)} StockX products."
+        )
+
+    def lookup(self, code: str) -> pd.DataFrame:
+        """
+        StockX rows matching a single style code, found in a hash map from
+        each code to its rows that is built on the first lookup.
+        """
+        if self._rows_by_key is None:
+            rows = self.keys["_stockx_row"].to_numpy()
+            self._rows_by_key = {
+                key: rows[positions]
+                for key, positions in self.keys.groupby("key").indices.items()
+            }
+        empty = np.empty(0, dtype=np.intp)
+        return self.stockx.iloc[
+            self._rows_by_key.get(normalize_style_code(code), empty)
+        ]
+
+    def match(self, offers: pd.DataFrame, column: str = "id") -> pd.DataFrame:
+        """
+        Join retailer offers to the StockX catalog.
+
+        Every StockX row is kept once per matching offer, or once with empty
+        offer columns when nothing matched. Match statistics are stored in
+        `report`.
+        """
+        offers = offers.reset_index(drop=True)
+        pairs = self._pairs(offers, column)
+
+        matched_rows = pairs["_stockx_row"].to_numpy()
+        unmatched_rows = np.setdiff1d(np.arange(len(self.stockx)), matched_rows)
+        stockx_rows = np.concatenate([matched_rows, unmatched_rows])
+        offer_rows = np.concatenate(
+            [pairs["_offer_row"].to_numpy(), np.full(len(unmatched_rows), -1)]
+        )
+        order = np.argsort(stockx_rows, kind="stable")
+
+        left = self.stockx.iloc[stockx_rows[order]].reset_index(drop=True)
+        # Row -1 is not in the offers index, so reindex fills it with NaN.
+        right = offers.reindex(offer_rows[order]).reset_index(drop=True)
+
+        matched_offers = pairs["_offer_row"].nunique()
+        self.report = {
+            "offers": len(offers),
+            "matched_offers": matched_offers,
+            "offer_match_rate": round(matched_offers / len(offers), 4)
+            if len(offers)
+            else 0.0,
+            "stockx_products": len(self.stockx),
+            "matched_products": len(self.stockx) - len(unmatched_rows),
+            "product_match_rate": (
+                round(1 - len(unmatched_rows) / len(self.stockx), 4)
+                if len(self.stockx)
+                else 0.0
+            ),
+        }
+        self.logging.info(f"Match report: {self.report}")
+
+        return pd.concat([left, right], axis=1, copy=False)
+
+    def match_offers(self, offers: pd.DataFrame, column: str = "id") -> pd.DataFrame:
+        """
+        Inner join of retailer offers to the StockX catalog: only matched pairs,
+        in offer order. Cheap enough to run on every scraped page.
+        """
+        offers = offers.reset_index(drop=True)
+        pairs = self._pairs(offers, column).sort_values("_offer_row", kind="stable")
+        left = self.stockx.iloc[pairs["_stockx_row"].to_numpy()].reset_index(drop=True)
+        right = offers.iloc[pairs["_offer_row"].to_numpy()].reset_index(drop=True)
+        return pd.concat([left, right], axis=1, copy=False)
+
+    def _pairs(self, offers: pd.DataFrame, column: str) -> pd.DataFrame:
+        """(StockX row, offer row) positions of every style code match."""
+        offer_keys = pd.DataFrame(
+            {
+                "key": normalize_style_codes(offers[column]).to_numpy(),
+                "_offer_row": np.arange(len(offers)),
+            }
+        ).dropna(subset=["key"])
+
+        return self.keys.merge(offer_keys, on="key")[
+            ["_stockx_row", "_offer_row"]
+        ].drop_duplicates()
+
+    def misses(self, offers: pd.DataFrame, column: str = "id") -> pd.DataFrame:
+        """Retailer offers whose style code is not in the StockX catalog."""
+        keys = normalize_style_codes(offers[column])
+        return offers[~keys.isin(self.keys["key"]).to_numpy()]